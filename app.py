@@ -1,9 +1,68 @@
+import time
+started = time.perf_counter()
+from utils.startup import startup
+startup.begin(started)
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+startup.mark("import Qt, OpenCV")
 from gui.main_window import MainWindow
+import argparse
 import sys
+startup.mark("import GUI")
+
+
+def preload_face_recognition():
+    # dlib, face_recognition, the gallery and the GPIO pin, then one pass over synthetic frames
+    import face_process
+    timings = face_process.get_default_recognizer().warm_up()
+    print(f"[INFO] face recognition warm-up: {timings[0] * 1000:.0f} ms first, "
+          f"{timings[-1] * 1000:.0f} ms last")
+
+
+def on_first_paint(window):
+    startup.mark("first paint")
+    startup.report()
+    # Heavy subsystems load and warm up behind the window instead of in front of it
+    startup.preload("face recognition", preload_face_recognition)
+    startup.preload("object detection", lambda: window.object_page.load_detector(warm_up=True))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Face recognition and object detection")
+    parser.add_argument("--replay", help="video file, image directory or glob, or \"synthetic\", "
+                                         "played instead of the live camera")
+    parser.add_argument("--pacing", default="realtime", choices=["realtime", "fixed", "fast"],
+                        help="how the replay is played, see utils.replay.ReplayCapture")
+    parser.add_argument("--fps", type=float, default=None, help="replay rate, needed for fixed pacing")
+    parser.add_argument("--loop", action="store_true", help="start the replay over at its end")
+    # Tracking moves the boxes between detections, adaptive detection picks where to detect
+    detection = parser.add_mutually_exclusive_group()
+    detection.add_argument("--tracking", action="store_true",
+                           help="detect faces every few frames and track them in between")
+    detection.add_argument("--adaptive", action="store_true",
+                           help="search the full frame now and then, in between only around faces, "
+                                "motion and face_process.adaptive_zones")
+    parser.add_argument("--dual-stream", action="store_true",
+                        help="detect faces on the substream, encode them from crops of the main stream "
+                             "while faces are in view")
+    # Anything else is left for Qt
+    return parser.parse_known_args()
+
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    args, qt_args = parse_args()
+    if args.replay:
+        from utils.camera_hub import hub, DEFAULT_STREAM, MAIN_STREAM
+        from utils.replay import replay_streams
+        # Every page subscribes to DEFAULT_STREAM, they all get the replay instead. The dual stream
+        # main stream plays the same clip, so a run never touches the live camera
+        replay_streams(hub, [DEFAULT_STREAM, MAIN_STREAM], args.replay, pacing=args.pacing, fps=args.fps,
+                       loop=args.loop)
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.mark("QApplication")
+    window = MainWindow(tracking=args.tracking, adaptive=args.adaptive, dual_stream=args.dual_stream)
+    startup.mark("main window")
     window.show()
+    # Runs once the event loop has painted the window
+    QTimer.singleShot(0, lambda: on_first_paint(window))
     sys.exit(app.exec_())
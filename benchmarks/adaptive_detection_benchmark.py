@@ -0,0 +1,90 @@
+# Run from the repository root: python -m benchmarks.adaptive_detection_benchmark
+import glob
+import os
+import time
+import cv2
+import numpy as np
+import face_recognition
+from utils.adaptive_detector import AdaptiveFaceDetector
+from utils.face_tracker import box_iou
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets", "face")
+FRAME_SIZE = (1280, 720)
+DOORWAY = (440, 80, 400, 560)  # x, y, w, h of the zone people walk through
+FACE_SIZES = [36, 48, 64, 96, 160]  # face heights in pixels, far to near
+FRAMES_PER_WALK = 40
+CV_SCALER = 4
+
+
+def load_faces():
+    """Dataset images cropped around their face, as BGR like camera frames, with the face box inside the crop."""
+    faces = []
+    for path in sorted(glob.glob(os.path.join(DATASET_DIR, "*", "*.jpg"))):
+        image = face_recognition.load_image_file(path)
+        locations = face_recognition.face_locations(image)
+        if len(locations) != 1:
+            continue
+        top, right, bottom, left = locations[0]
+        size = bottom - top
+        y0, y1 = max(0, top - size // 2), min(image.shape[0], bottom + size // 2)
+        x0, x1 = max(0, left - size // 2), min(image.shape[1], right + size // 2)
+        faces.append((cv2.cvtColor(image[y0:y1, x0:x1], cv2.COLOR_RGB2BGR), (top - y0, right - x0, bottom - y0, left - x0)))
+    return faces
+
+
+def walks(faces, rng):
+    """Synthetic clips of one face moving through the doorway, at every face size."""
+    width, height = FRAME_SIZE
+    background = cv2.GaussianBlur(rng.integers(60, 200, (height, width, 3), dtype=np.uint8), (31, 31), 0)
+    for face_height in FACE_SIZES:
+        crop, (top, right, bottom, left) = faces[face_height % len(faces)]
+        scale = face_height / (bottom - top)
+        crop = cv2.resize(crop, (0, 0), fx=scale, fy=scale)
+        box = [int(v * scale) for v in (top, right, bottom, left)]
+        frames = []
+        for i in range(FRAMES_PER_WALK):
+            x = DOORWAY[0] + int((DOORWAY[2] - crop.shape[1]) * i / (FRAMES_PER_WALK - 1))
+            y = DOORWAY[1] + (DOORWAY[3] - crop.shape[0]) // 2
+            frame = background.copy()
+            frame[y:y + crop.shape[0], x:x + crop.shape[1]] = crop
+            truth = (box[0] + y, box[1] + x, box[2] + y, box[3] + x)
+            frames.append((frame, truth))
+        # Nobody in view for a while between two walks
+        frames += [(background.copy(), None)] * (FRAMES_PER_WALK // 2)
+        yield face_height, frames
+
+
+def fixed_downscale(frame):
+    small = cv2.cvtColor(cv2.resize(frame, (0, 0), fx=1 / CV_SCALER, fy=1 / CV_SCALER), cv2.COLOR_BGR2RGB)
+    return [tuple(v * CV_SCALER for v in location) for location in face_recognition.face_locations(small)]
+
+
+def evaluate(detect, frames):
+    found, total, elapsed = 0, 0, 0.0
+    for frame, truth in frames:
+        started = time.perf_counter()
+        locations = detect(frame)
+        elapsed += time.perf_counter() - started
+        if truth is not None:
+            total += 1
+            found += any(box_iou(truth, location) > 0.3 for location in locations)
+    return found / total, elapsed / len(frames) * 1000
+
+
+def main():
+    faces = load_faces()
+    if not faces:
+        print(f"[ERROR] no faces found in {DATASET_DIR}")
+        return
+    rng = np.random.default_rng(0)
+    print(f"{'face px':>8} {'fixed recall':>13} {'fixed ms':>9} {'adaptive recall':>16} {'adaptive ms':>12}")
+    for face_height, frames in walks(faces, rng):
+        adaptive = AdaptiveFaceDetector(zones=[DOORWAY + (48,)])
+        fixed_recall, fixed_ms = evaluate(fixed_downscale, frames)
+        adaptive_recall, adaptive_ms = evaluate(adaptive.detect, frames)
+        print(f"{face_height:>8} {fixed_recall:>13.0%} {fixed_ms:>9.1f} {adaptive_recall:>16.0%} {adaptive_ms:>12.1f}"
+              f"   {adaptive.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Run from the repository root: python -m benchmarks.batch_encoder_benchmark
+import glob
+import os
+import threading
+import time
+import numpy as np
+import face_recognition
+from utils.batch_encoder import ProcessEncoder
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets", "face")
+FRAMES_PER_CAMERA = 40
+CAMERAS = [1, 4, 8]
+SETTINGS = [(1, 1, 0.0), (1, 16, 0.0), (1, 16, 0.005), (2, 16, 0.005), (2, 32, 0.02)]  # (workers, max_batch, max_wait)
+
+
+def load_frames():
+    """Dataset images with the faces found in them, detected once up front."""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(DATASET_DIR, "*", "*.jpg"))):
+        image = face_recognition.load_image_file(path)
+        locations = face_recognition.face_locations(image)
+        if locations:
+            frames.append((image, locations))
+    return frames
+
+
+def run_cameras(cameras, frames, encode):
+    """Every camera encodes its frames one after another on its own thread."""
+    latencies = []
+    lock = threading.Lock()
+
+    def camera(offset):
+        for i in range(FRAMES_PER_CAMERA):
+            image, locations = frames[(offset + i) % len(frames)]
+            started = time.perf_counter()
+            encode(image, locations)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=camera, args=(offset,)) for offset in range(cameras)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    faces = sum(len(frames[(offset + i) % len(frames)][1])
+                for offset in range(cameras) for i in range(FRAMES_PER_CAMERA))
+    return faces / elapsed, np.mean(latencies) * 1000
+
+
+def main():
+    frames = load_frames()
+    if not frames:
+        print(f"[ERROR] no faces found in {DATASET_DIR}")
+        return
+    print(f"[INFO] {len(frames)} frames with faces")
+    print(f"{'cameras':>8} {'mode':>28} {'faces/s':>9} {'latency ms':>11} {'batch':>6}")
+    for cameras in CAMERAS:
+        unbatched = lambda image, locations: face_recognition.face_encodings(image, locations, model="large")
+        rate, latency = run_cameras(cameras, frames, unbatched)
+        print(f"{cameras:>8} {'face_encodings':>28} {rate:>9.1f} {latency:>11.1f} {'-':>6}")
+
+        for workers, max_batch, max_wait in SETTINGS:
+            encoder = ProcessEncoder(workers=workers, max_batch=max_batch, max_wait=max_wait)
+            # The first call starts the worker processes and loads their models
+            encoder.encode(*frames[0])
+            encoder.batches = encoder.faces_encoded = 0
+            rate, latency = run_cameras(cameras, frames, encoder.encode)
+            encoder.close()
+            mode = f"{workers}p, batch {max_batch}, wait {max_wait * 1000:g} ms"
+            print(f"{cameras:>8} {mode:>28} {rate:>9.1f} {latency:>11.1f} {encoder.mean_batch_size:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Run from the repository root: python -m benchmarks.capture_benchmark
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+
+FRAME_SIZE = (1280, 720)
+MAIN_STREAM_SIZE = (1920, 1080)  # the main stream dual stream mode encodes faces from
+FRAMES = 250
+CODECS = [("mp4v", "mp4"), ("XVID", "avi"), ("MJPG", "avi")]
+KEEP_EVERY = [1, 2, 5, 10]  # camera frames per processed frame, 5 is a 25 fps camera at 5 fps inference
+
+
+def write_clip(path, fourcc, size=FRAME_SIZE):
+    """A moving blob on a textured background, so the encoder has real work to do."""
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), 25, size)
+    if not writer.isOpened():
+        return False
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (21, 21), 0)
+    for i in range(FRAMES):
+        frame = background.copy()
+        cv2.circle(frame, (100 + 4 * i, height // 2), 80, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return True
+
+
+def cpu_per_frame(path, keep_every, grab):
+    """CPU milliseconds per camera frame when only every keep_every-th frame is used.
+    read() converts every frame and throws most away, grab() only retrieves the ones kept.
+    A keep_every of None grabs every frame and retrieves none, which still
+    decodes each frame: a stream kept open costs this even when nothing is used.
+    """
+    cap = cv2.VideoCapture(path)
+    started = time.process_time()
+    count = 0
+    while True:
+        if grab:
+            ok = cap.grab()
+            if ok and keep_every is not None and count % keep_every == 0:
+                cap.retrieve()
+        else:
+            ok, _ = cap.read()
+        if not ok:
+            break
+        count += 1
+    cap.release()
+    return (time.process_time() - started) * 1000 / max(count, 1)
+
+
+def main():
+    print(f"{'codec':>6} {'keep 1 in':>10} {'read ms':>8} {'grab ms':>8} {'saved':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for fourcc, extension in CODECS:
+            path = os.path.join(directory, f"clip.{extension}")
+            if not write_clip(path, fourcc):
+                print(f"[INFO] {fourcc} encoder not available, skipped")
+                continue
+            for keep_every in KEEP_EVERY:
+                read_ms = cpu_per_frame(path, keep_every, grab=False)
+                grab_ms = cpu_per_frame(path, keep_every, grab=True)
+                print(f"{fourcc:>6} {keep_every:>10} {read_ms:>8.2f} {grab_ms:>8.2f} {1 - grab_ms / read_ms:>6.0%}")
+
+        # An open main stream nobody reads from is still decoded, which is most of what read() costs
+        width, height = MAIN_STREAM_SIZE
+        print(f"\nmain stream {width}x{height}, grabbed and never retrieved")
+        print(f"{'codec':>6} {'read ms':>8} {'grab ms':>8} {'saved':>6}")
+        for fourcc, extension in CODECS:
+            path = os.path.join(directory, f"main.{extension}")
+            if not write_clip(path, fourcc, MAIN_STREAM_SIZE):
+                continue
+            read_ms = cpu_per_frame(path, 1, grab=False)
+            grab_ms = cpu_per_frame(path, None, grab=True)
+            print(f"{fourcc:>6} {read_ms:>8.2f} {grab_ms:>8.2f} {1 - grab_ms / read_ms:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Run from the repository root: python -m benchmarks.display_benchmark
+# Works without a screen, Qt is started with the offscreen platform if none is set.
+import os
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication, QLabel
+from PyQt5.QtGui import QImage, QPixmap
+from gui.display import BufferRing, FrameDisplay
+
+CAMERA_SIZE = (1280, 720)
+DISPLAY_SIZE = (640, 480)
+FRAMES = 300
+
+
+def legacy_path(label, frame):
+    """What the pages used to do per frame: resize, copy, RGB for the detector, QImage, QPixmap."""
+    image = cv2.resize(frame, DISPLAY_SIZE)
+    detection_frame = image.copy()
+    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    height, width, channel = detection_frame.shape
+    qt_image = QImage(detection_frame.data, width, height, channel * width, QImage.Format_BGR888)
+    label.setPixmap(QPixmap.fromImage(qt_image))
+    return rgb_image
+
+
+class BufferedPath:
+    """The new path: resize into a ring buffer, RGB into a reused buffer, QImage without a copy."""
+
+    def __init__(self, label):
+        self.frames = BufferRing(3)
+        self.display = FrameDisplay(label)
+        self.rgb = None
+
+    def __call__(self, label, frame):
+        image = self.frames.fill(frame, DISPLAY_SIZE)
+        if self.rgb is None:
+            self.rgb = np.empty_like(image)
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        self.display.show(image)
+        return self.rgb
+
+
+def run(name, path, label, frames):
+    path(label, frames[0])  # warm up, lets the buffers get allocated
+
+    # Timing pass, tracemalloc would slow every allocation down so it is measured separately
+    latencies = []
+    for frame in frames:
+        # The frame counts as captured when the camera thread hands it over
+        captured = time.perf_counter()
+        path(label, frame)
+        latencies.append(time.perf_counter() - captured)
+
+    # Allocation pass, the peak above the starting point is what one frame allocates
+    tracemalloc.start()
+    allocated = 0
+    for frame in frames:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        path(label, frame)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    print(f"{name:>10} {allocated / len(frames) / 1024:>14.1f} "
+          f"{np.mean(latencies):>10.2f} {np.percentile(latencies, 95):>10.2f}")
+
+
+def main():
+    app = QApplication([])
+    label = QLabel()
+    label.resize(*DISPLAY_SIZE)
+    rng = np.random.default_rng(0)
+    height, width = CAMERA_SIZE[1], CAMERA_SIZE[0]
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(FRAMES)]
+
+    # numpy reports its buffers to tracemalloc, so the allocation column covers the frame copies
+    print(f"{'path':>10} {'KiB alloc/frame':>14} {'mean ms':>10} {'p95 ms':>10}")
+    run("legacy", legacy_path, label, frames)
+    run("buffered", BufferedPath(label), label, frames)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
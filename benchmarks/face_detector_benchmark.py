@@ -0,0 +1,83 @@
+# Run from the repository root: python -m benchmarks.face_detector_benchmark
+import glob
+import json
+import os
+import time
+import cv2
+import numpy as np
+import face_recognition
+from utils.face_detectors import FACE_DETECTORS, create_face_detector
+from utils.face_tracker import box_iou
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), "datasets", "face")
+# Reference (top, right, bottom, left) box of the one face in each dataset image, by dataset path.
+# Proposed by dlib's CNN detector and checked by eye, so CNN at full size matches them closely
+REFERENCE_BOXES = os.path.join(BENCHMARK_DIR, "face_boxes.json")
+MIN_IOU = 0.4  # loose enough for backends that frame the face differently, BlazeFace includes the forehead
+SCALES = [1.0, 0.5, 0.25]  # frame downscales, 0.25 is cv_scaler = 4
+RUNS = 3
+
+
+def load_images():
+    """Every dataset image with its reference box and the encoding made from that box."""
+    with open(REFERENCE_BOXES) as f:
+        boxes = json.load(f)
+    images = []
+    for path in sorted(glob.glob(os.path.join(DATASET_DIR, "*", "*.jpg"))):
+        name = os.path.relpath(path, DATASET_DIR).replace(os.sep, "/")
+        if name not in boxes:
+            print(f"[INFO] no reference box for {name}, add it to {REFERENCE_BOXES}")
+            continue
+        image = face_recognition.load_image_file(path)
+        box = tuple(boxes[name])
+        images.append((image, box, face_recognition.face_encodings(image, [box])[0]))
+    return images
+
+
+def evaluate(detector, images, scale):
+    """Latency, recall and how well the boxes encode. A face counts as found when a detection
+    overlaps its reference box by MIN_IOU. The distance is between the encoding made from the
+    matching detection and the one from the reference box, well below the 0.6 tolerance is good.
+    """
+    timings, found, distances = [], 0, []
+    for image, reference_box, reference in images:
+        small = cv2.resize(image, (0, 0), fx=scale, fy=scale) if scale != 1.0 else image
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            locations = detector.detect(small)
+            timings.append(time.perf_counter() - started)
+        # Back to full-image pixels, encoded there as encode_full_resolution does
+        locations = [(int(top / scale), int(right / scale), int(bottom / scale), int(left / scale))
+                     for top, right, bottom, left in locations]
+        box = max(locations, key=lambda location: box_iou(location, reference_box), default=None)
+        if box is None or box_iou(box, reference_box) < MIN_IOU:
+            continue
+        found += 1
+        encoding = face_recognition.face_encodings(image, [box])[0]
+        distances.append(np.linalg.norm(encoding - reference))
+    return np.median(timings) * 1000, found / len(images), np.mean(distances) if distances else float("nan")
+
+
+def main():
+    images = load_images()
+    if not images:
+        print(f"[ERROR] no annotated images in {DATASET_DIR}")
+        return
+    height, width = images[0][0].shape[:2]
+    print(f"[INFO] {len(images)} images of {width}x{height} with one face each")
+    print(f"{'backend':>10} {'scale':>6} {'median ms':>10} {'recall':>7} {'distance':>9}")
+    for name in FACE_DETECTORS:
+        try:
+            detector = create_face_detector(name)
+        except Exception as e:
+            # MediaPipe or its model file may be missing on this device
+            print(f"[INFO] {name} skipped: {e}")
+            continue
+        for scale in SCALES:
+            latency, recall, distance = evaluate(detector, images, scale)
+            print(f"{name:>10} {scale:>6g} {latency:>10.1f} {recall:>7.0%} {distance:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Run from the repository root: python -m benchmarks.face_index_benchmark
+import time
+import numpy as np
+from utils.face_index import FaceIndex
+
+GALLERY_SIZES = [10, 100, 1_000, 10_000, 100_000]
+ENCODINGS_PER_IDENTITY = 10
+QUERIES = 200
+
+
+def synthetic_gallery(size, rng):
+    """Clustered 128-d encodings that look like a real enrolment set."""
+    identities = max(1, size // ENCODINGS_PER_IDENTITY)
+    centers = rng.normal(0, 0.09, (identities, 128)).astype(np.float32)
+    labels = np.arange(size) % identities
+    encodings = centers[labels] + rng.normal(0, 0.02, (size, 128)).astype(np.float32)
+    return encodings, [f"person_{label}" for label in labels], centers
+
+
+def time_search(index, queries):
+    index.search(queries[:1])  # warm up
+    start = time.perf_counter()
+    for query in queries:
+        names, _ = index.search(query[None, :])
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'gallery':>8} {'build s':>8} {'exact us/face':>14} {'index us/face':>14} {'agreement':>10}")
+    for size in GALLERY_SIZES:
+        encodings, names, centers = synthetic_gallery(size, rng)
+        picks = rng.integers(0, len(centers), QUERIES)
+        queries = centers[picks] + rng.normal(0, 0.02, (QUERIES, 128)).astype(np.float32)
+
+        start = time.perf_counter()
+        index = FaceIndex(encodings, names)
+        build_time = time.perf_counter() - start
+        exact = FaceIndex(encodings, names, exact_threshold=len(encodings))
+
+        exact_latency = time_search(exact, queries)
+        index_latency = time_search(index, queries)
+        agreement = np.mean(np.array(index.search(queries)[0]) == np.array(exact.search(queries)[0]))
+
+        print(f"{size:>8} {build_time:>8.2f} {exact_latency * 1e6:>14.1f} "
+              f"{index_latency * 1e6:>14.1f} {agreement:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Run from the repository root: python -m benchmarks.replay_benchmark datasets/face --pipeline face
+import argparse
+import hashlib
+import os
+import time
+import numpy as np
+from utils.replay import ReplayCapture, open_source
+
+
+def face_pipeline(args):
+    import face_process
+    from utils.face_index import FaceIndex
+    if os.path.exists(face_process.ENCODINGS_PATH) or os.path.exists(face_process.LEGACY_ENCODINGS_PATH):
+        gallery = face_process.load_gallery()
+    else:
+        print("[INFO] no gallery trained yet, every face is Unknown")
+        gallery = FaceIndex()
+    recognizer = face_process.FaceRecognizer(gallery, cv_scaler=args.cv_scaler, verbose=False)
+
+    def run(frame, timestamp_ms):
+        result = recognizer.process_frame(frame)
+        # Everything that ends up on screen or drives the GPIO pin, encodings to the last bit
+        return repr((result.locations, result.names, result.scale)).encode() + b"".join(
+            np.asarray(encoding).tobytes() for encoding in result.encodings)
+    return run
+
+
+def object_pipeline(args):
+    from utils.object_detector import ObjectDetector
+    detector = ObjectDetector(args.model)
+
+    def run(frame, timestamp_ms):
+        result = detector.detect(frame)
+        return repr([(d.bounding_box.origin_x, d.bounding_box.origin_y, d.bounding_box.width,
+                      d.bounding_box.height, d.categories[0].category_name, d.categories[0].score)
+                     for d in result.detections]).encode()
+    return run
+
+
+PIPELINES = {"face": face_pipeline, "object": object_pipeline}
+
+
+def replay(args, run):
+    """Play the source once through a pipeline.
+    :return: (frames, per-frame latencies in seconds, digest of every result)
+    """
+    capture = ReplayCapture(open_source(args.source, fps=args.fps), pacing=args.pacing, fps=args.fps)
+    digest = hashlib.sha1()
+    latencies = []
+    frames = 0
+    while frames < args.frames and not capture.finished:
+        ok, frame = capture.read()
+        if not ok:
+            time.sleep(0.001)
+            continue
+        frames += 1
+        timestamp_ms = capture.timestamp_ms(capture.read_index)
+        started = time.perf_counter()
+        output = run(frame, timestamp_ms)
+        latencies.append(time.perf_counter() - started)
+        digest.update(str(timestamp_ms).encode() + output)
+    capture.release()
+    return frames, latencies, digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a pipeline headless over a recorded clip, image directory "
+                                                 "or synthetic frames")
+    parser.add_argument("source", help="video file, image directory or glob, or \"synthetic\"")
+    parser.add_argument("--pipeline", default="face", choices=list(PIPELINES))
+    parser.add_argument("--pacing", default="fast", choices=["realtime", "fixed", "fast"],
+                        help="fast processes every frame and is repeatable bit for bit")
+    parser.add_argument("--fps", type=float, default=None, help="play rate, needed for fixed pacing")
+    parser.add_argument("--frames", type=int, default=300, help="most frames to process")
+    parser.add_argument("--repeat", type=int, default=2, help="runs, their digests should all match")
+    parser.add_argument("--cv-scaler", type=int, default=4)
+    parser.add_argument("--model", default="models/efficientdet_lite0.tflite")
+    args = parser.parse_args()
+
+    run = PIPELINES[args.pipeline](args)
+    digests = set()
+    print(f"{'run':>4} {'frames':>7} {'mean ms':>8} {'p95 ms':>7} {'frames/s':>9}  digest")
+    for i in range(args.repeat):
+        started = time.perf_counter()
+        frames, latencies, digest = replay(args, run)
+        elapsed = time.perf_counter() - started
+        digests.add(digest)
+        print(f"{i + 1:>4} {frames:>7} {np.mean(latencies) * 1000:>8.1f} {np.percentile(latencies, 95) * 1000:>7.1f} "
+              f"{frames / elapsed:>9.1f}  {digest}")
+    if args.pacing == "fast" and len(digests) > 1:
+        print("[ERROR] runs gave different results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+
+
+class BufferRing:
+    """A few preallocated frame buffers handed out in turn.
+
+    A buffer comes back around after `count` calls, so count has to be larger
+    than the number of frames that can still be in use elsewhere (for example
+    in flight in a detector).
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self._buffers = []
+        self._next = 0
+
+    def next(self, shape, dtype=np.uint8):
+        if not self._buffers or self._buffers[0].shape != shape:
+            self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.count)]
+        buffer = self._buffers[self._next]
+        self._next = (self._next + 1) % self.count
+        return buffer
+
+    def fill(self, frame, size=None):
+        """Copy frame into the next buffer, resizing it to size (w, h) on the way if needed."""
+        width, height = size or (frame.shape[1], frame.shape[0])
+        buffer = self.next((height, width) + frame.shape[2:], frame.dtype)
+        if (width, height) == (frame.shape[1], frame.shape[0]):
+            np.copyto(buffer, frame)
+        else:
+            cv2.resize(frame, (width, height), dst=buffer)
+        return buffer
+
+
+class FrameDisplay:
+    """Shows BGR frames on a QLabel with as few copies as possible.
+
+    The frame is wrapped in a QImage without copying. It is only scaled when
+    the label's size differs from the frame's, into a buffer that is reused
+    until the label is resized, so the QPixmap conversion is the only copy per
+    frame in the common case.
+    """
+
+    def __init__(self, label, scale_to_label=False):
+        """
+        :param label: QLabel to show the frames on
+        :param scale_to_label: fit frames to the label size, keeping the aspect ratio
+        """
+        self.label = label
+        self.scale_to_label = scale_to_label
+        self._label_size = None
+        self._target = None
+        self._scaled = None
+
+    def _target_size(self, frame):
+        size = self.label.size()
+        label_size = (size.width(), size.height())
+        if label_size != self._label_size:
+            # Only recomputed when the label is resized
+            self._label_size = label_size
+            height, width = frame.shape[:2]
+            scale = min(label_size[0] / width, label_size[1] / height)
+            self._target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        return self._target
+
+    def show(self, frame):
+        """Display a BGR frame, which may be a read-only view."""
+        if self.scale_to_label:
+            width, height = self._target_size(frame)
+            if (width, height) != (frame.shape[1], frame.shape[0]):
+                if self._scaled is None or self._scaled.shape[:2] != (height, width):
+                    self._scaled = np.empty((height, width, 3), dtype=np.uint8)
+                cv2.resize(frame, (width, height), dst=self._scaled)
+                frame = self._scaled
+
+        if not frame.flags["C_CONTIGUOUS"]:
+            frame = np.ascontiguousarray(frame)
+        height, width, channel = frame.shape
+        qt_image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_BGR888)
+        self.label.setPixmap(QPixmap.fromImage(qt_image))
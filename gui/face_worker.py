@@ -0,0 +1,100 @@
+import threading
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class FaceRecognitionWorker(QThread):
+    """Runs face recognition off the Qt main thread.
+
+    The page submits frames at camera rate, the worker only keeps the newest one
+    and processes it when it is free, so inference never queues up behind the
+    camera. Results come back on the UI thread through results_ready as a dict
+    with the face locations, their scale and names, the authorization result
+    and the latency.
+
+    A thread alone does not keep the UI live: dlib's encoder holds the GIL for
+    about 130 ms per face. The default recognizer therefore encodes in a
+    ProcessEncoder, a recognizer that encodes on this thread still stalls the
+    UI for that long per face.
+    """
+
+    results_ready = pyqtSignal(object)
+
+    def __init__(self, recognize=None, parent=None):
+        """
+        :param recognize: process_frame, track_frame or process_regions of a FaceRecognizer, defaults to
+            face_process.get_default_recognizer().process_frame
+        """
+        super().__init__(parent)
+        if recognize is None:
+            import face_process
+            recognize = face_process.get_default_recognizer().process_frame
+        self.recognize = recognize
+        self._condition = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._stopping = False
+
+        self.frames_submitted = 0
+        self.frames_replaced = 0
+        self.errors = 0
+        self.latency = 0.0  # seconds from submit to result, moving average
+
+    def submit(self, frame, *args):
+        """Hand the newest frame to the worker, replacing one it has not started yet.
+        The worker only reads the frame, the caller must not draw on it afterwards.
+        :param args: passed on to recognize after the frame, such as the regions of process_regions
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.frames_replaced += 1
+            self._pending = (frame, args, time.monotonic())
+            self.frames_submitted += 1
+            self._condition.notify()
+
+    @property
+    def queue_depth(self):
+        """Frames waiting or being processed, at most 2."""
+        with self._condition:
+            return int(self._pending is not None) + int(self._busy)
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                (frame, args, submitted_at), self._pending = self._pending, None
+                self._busy = True
+
+            try:
+                recognition = self.recognize(frame, *args)
+            except Exception as e:
+                # Counted and reported, the worker carries on with the next frame
+                with self._condition:
+                    self._busy = False
+                self.errors += 1
+                print(f"[ERROR] face recognition failed: {e}")
+                continue
+            result = {
+                "locations": list(recognition.locations),
+                "names": list(recognition.names),
+                "scale": recognition.scale,
+                "authorized": recognition.authorized,
+                "user": recognition.name,
+                "latency": time.monotonic() - submitted_at,
+            }
+
+            with self._condition:
+                self._busy = False
+            self.latency = result["latency"] if self.latency == 0.0 else 0.8 * self.latency + 0.2 * result["latency"]
+            self.results_ready.emit(result)
+
+    def stop(self):
+        """Finish the frame in progress and stop the thread."""
+        with self._condition:
+            self._stopping = True
+            self._pending = None
+            self._condition.notify()
+        self.wait()
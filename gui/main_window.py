@@ -1,9 +1,16 @@
 from PyQt5.QtWidgets import QMainWindow, QStackedWidget
+from PyQt5.QtCore import QTimer
+from utils.startup import startup
 from gui.face_page import FacePage
 from gui.object_page import ObjectPage
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, tracking=False, adaptive=False, dual_stream=False):
+        """
+        :param tracking: detect faces every few frames and track them in between, see FacePage
+        :param adaptive: search faces around known faces, motion and zones instead of the whole frame
+        :param dual_stream: detect faces on the substream and encode them from main stream crops
+        """
         super().__init__()
 
         self.setWindowTitle("Face Recognition and Object Detection")
@@ -15,7 +22,7 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.stack)
 
         # Add pages to the stack
-        self.face_page = FacePage(self)
+        self.face_page = FacePage(self, tracking=tracking, adaptive=adaptive, dual_stream=dual_stream)
         self.object_page = ObjectPage(self)
 
         self.stack.addWidget(self.face_page)
@@ -24,6 +31,22 @@ class MainWindow(QMainWindow):
         # Set the initial page to the Face Recognition page
         self.stack.setCurrentWidget(self.face_page)  # Load FacePage first
 
+        # Show background loading and warm-up in the status bar until everything is ready
+        self.readiness_timer = QTimer()
+        self.readiness_timer.timeout.connect(self.update_readiness)
+        self.readiness_timer.start(200)
+
+    def update_readiness(self):
+        pending = startup.pending()
+        if pending:
+            self.statusBar().showMessage("Warming up: " + ", ".join(pending) + "...")
+            return
+        self.readiness_timer.stop()
+        if startup.errors:
+            self.statusBar().showMessage("Failed to load: " + ", ".join(startup.errors))
+        else:
+            self.statusBar().showMessage("Ready", 5000)
+
     def switch_to_object_detection(self):
         """Switch to the object detection page."""
         self.stack.setCurrentWidget(self.object_page)
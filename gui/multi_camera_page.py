@@ -0,0 +1,192 @@
+import argparse
+import math
+import os
+import sys
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout, QGridLayout, QSizePolicy
+from PyQt5.QtCore import QTimer, Qt
+from utils.camera_hub import hub, DEFAULT_STREAM
+from utils.stream_scheduler import StreamScheduler
+from utils.visualize import visualize
+from gui.display import BufferRing, FrameDisplay
+
+class MultiCameraPage(QWidget):
+    """Grid of camera streams, each with its own inference budget.
+
+    Detection or recognition runs on a StreamScheduler worker pool, the UI
+    timer only draws the results that came back since the last tick. Every tile
+    shows its achieved and target FPS.
+    """
+
+    def __init__(self, sources, mode="object", fps=5.0, priorities=None, workers=None,
+                 model="models/efficientdet_lite0.tflite", max_results=5, score_threshold=0.25):
+        """
+        :param sources: RTSP URLs, file paths or camera indexes, one tile each
+        :param mode: "object" for object detection, "face" for face recognition
+        :param fps: target inference rate, one number for all streams or one per stream
+        :param priorities: relative weight of each stream when overloaded, all equal if None
+        :param workers: inference threads, defaults to the number of cores
+        """
+        super().__init__()
+        self.setWindowTitle("Cameras")
+        self.setGeometry(100, 100, 1200, 800)
+
+        self.sources = list(sources)
+        self.mode = mode
+        self.fps = fps if isinstance(fps, (list, tuple)) else [fps] * len(self.sources)
+        self.priorities = priorities or [1.0] * len(self.sources)
+        self.model = model
+        self.max_results = max_results
+        self.score_threshold = score_threshold
+        self.scheduler = StreamScheduler(workers=workers)
+        self.subscriptions = {}
+        self.gallery = None
+        self.encoder = None
+        # Built the first time the page is shown and kept for later shows, closed with the page
+        self.processors = {}
+        self.detectors = []
+
+        # One tile per camera: the video on top, its frame rates below
+        grid = QGridLayout(self)
+        columns = math.ceil(math.sqrt(len(self.sources)))
+        self.tiles = {}
+        for index, source in enumerate(self.sources):
+            name = f"Camera {index + 1}"
+            video_label = QLabel(name)
+            video_label.setAlignment(Qt.AlignCenter)
+            video_label.setStyleSheet("border:1px solid black;")
+            # Let the grid decide the size, the frames are scaled to fit
+            video_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+            stats_label = QLabel(f"{name}: waiting...")
+
+            tile = QVBoxLayout()
+            tile.addWidget(video_label, 1)
+            tile.addWidget(stats_label)
+            grid.addLayout(tile, index // columns, index % columns)
+            self.tiles[name] = {
+                "source": source,
+                "stats": stats_label,
+                "frames": BufferRing(1),
+                "display": FrameDisplay(video_label, scale_to_label=True),
+            }
+
+        # The UI timer only draws, the inference happens on the scheduler's workers
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_frames)
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.update_stats)
+
+    def create_processor(self):
+        """One detector or recognizer per stream. Object detectors never wait on each other,
+        face recognizers still share dlib's detector lock.
+        """
+        if self.mode == "face":
+            import face_process
+            from utils.batch_encoder import ProcessEncoder
+            if self.gallery is None:
+                # The grid only displays and does not drive the GPIO pin, so not the default recognizer
+                self.gallery = face_process.load_gallery()
+            if self.encoder is None:
+                # dlib's encoder holds the GIL, in processes the cameras' faces are encoded on
+                # separate cores and the UI stays live. Faces that arrive from several cameras
+                # within 10 ms go out in one batch. Detection is serialized process-wide
+                self.encoder = ProcessEncoder(workers=min(len(self.sources), os.cpu_count() or 1),
+                                              max_wait=0.01)
+            return face_process.FaceRecognizer(self.gallery, cv_scaler=face_process.cv_scaler,
+                                               authorized_names=face_process.authorized_names,
+                                               encoder=self.encoder, verbose=False).process_frame
+        from utils.object_detector import ObjectDetector
+        detector = ObjectDetector(self.model, max_results=self.max_results,
+                                  score_threshold=self.score_threshold)
+        self.detectors.append(detector)
+        return detector.detect
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.subscriptions:
+            return
+        for (name, tile), fps, priority in zip(self.tiles.items(), self.fps, self.priorities):
+            # The stream only converts frames at the rate the budget asks for
+            subscription = hub.subscribe(tile["source"], fps=fps)
+            self.subscriptions[name] = subscription
+            if name not in self.processors:
+                self.processors[name] = self.create_processor()
+            self.scheduler.add_stream(name, subscription, self.processors[name], fps=fps, priority=priority)
+        self.scheduler.start()
+        self.timer.start(30)
+        self.stats_timer.start(1000)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.stop()
+
+    def stop(self):
+        self.timer.stop()
+        self.stats_timer.stop()
+        # Only waits briefly, a worker still in the middle of a frame finishes it on its own
+        self.scheduler.stop()
+        for name, subscription in self.subscriptions.items():
+            self.scheduler.remove_stream(name)
+            subscription.release()
+        self.subscriptions = {}
+
+    def update_frames(self):
+        for name, tile in self.tiles.items():
+            frame, result = self.scheduler.take(name)
+            if frame is None:
+                continue
+            # The shared frame is read-only, results are drawn on a reused buffer
+            display_frame = tile["frames"].fill(frame)
+            if self.mode == "face":
+                from face_process import draw_results  # loaded by create_processor
+                draw_results(display_frame, result.locations, result.names, scale=result.scale)
+            else:
+                display_frame, _ = visualize(display_frame, result)
+            tile["display"].show(display_frame)
+
+    def update_stats(self):
+        for report in self.scheduler.report():
+            tile = self.tiles[report["name"]]
+            text = f"{report['name']}: {report['achieved_fps']:.1f} / {report['target_fps']:.1f} fps"
+            if report["allowed_fps"] < report["target_fps"]:
+                # Overloaded, the scheduler lowered this stream's rate
+                text += f" (limited to {report['allowed_fps']:.1f})"
+            if self.subscriptions[report["name"]].is_stale():
+                text += " - no signal"
+            tile["stats"].setText(text)
+
+    def closeEvent(self, event):
+        self.stop()
+        # close() waits for a frame still being detected
+        for detector in self.detectors:
+            detector.close()
+        self.detectors = []
+        self.processors = {}
+        if self.encoder is not None:
+            self.encoder.close()
+            self.encoder = None
+        super().closeEvent(event)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch several cameras with per-stream inference budgets")
+    parser.add_argument("sources", nargs="*", default=[DEFAULT_STREAM])
+    parser.add_argument("--face", action="store_true", help="face recognition instead of object detection")
+    parser.add_argument("--fps", type=float, default=5.0, help="target inference rate per stream")
+    parser.add_argument("--workers", type=int, default=None, help="inference threads, defaults to the core count")
+    parser.add_argument("--replay", help="video file, image directory or glob, or \"synthetic\", "
+                                         "played instead of every source")
+    parser.add_argument("--pacing", default="realtime", choices=["realtime", "fixed", "fast"],
+                        help="how the replay is played, see utils.replay.ReplayCapture")
+    parser.add_argument("--replay-fps", type=float, default=None, help="replay rate, needed for fixed pacing")
+    parser.add_argument("--loop", action="store_true", help="start the replay over at its end")
+    args = parser.parse_args()
+    if args.replay:
+        from utils.replay import replay_streams
+        # One playback per tile, each camera's own StreamBudget reads it
+        replay_streams(hub, list(dict.fromkeys(args.sources)), args.replay, pacing=args.pacing,
+                       fps=args.replay_fps, loop=args.loop)
+
+    app = QApplication(sys.argv)
+    window = MultiCameraPage(args.sources, mode="face" if args.face else "object",
+                             fps=args.fps, workers=args.workers)
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,167 @@
+import cv2
+from utils.face_detectors import HogFaceDetector
+from utils.face_tracker import box_iou
+from utils.motion_gate import MotionGate
+
+
+class AdaptiveFaceDetector:
+    """Face detection that only scans where faces are likely, each region at its own scale.
+
+    A full-frame pass at full_frame_scale runs every full_frame_every frames.
+    In between only regions are searched: around the faces found last time
+    and where the picture changed. Configured zones, such as the doorway, say
+    how big a face is expected to be there; moving regions inside a zone are
+    searched at that zone's scale, and zones are searched as a whole during
+    full-frame passes when they need a finer scale than the pass has.
+
+    Each region is resized so the face expected there comes out at about
+    target_face pixels, the smallest size the HOG detector finds without
+    upsampling, and searched with the detector backend. Small faces far from
+    the camera are scanned at a higher resolution than the global downscale
+    gives them, while a still scene costs next to nothing between full-frame
+    passes. Frames are BGR, only the regions searched are converted to RGB.
+    """
+
+    def __init__(self, zones=(), full_frame_every=15, full_frame_scale=0.25, target_face=80, default_face=60,
+                 track_margin=0.75, max_scale=2.0, max_coverage=0.6, motion=True, upsample=1, backend=None):
+        """
+        :param zones: (x, y, w, h, expected_face_px) areas in full-frame pixels with the face size expected there
+        :param full_frame_every: frames between two full-frame passes
+        :param full_frame_scale: downscale of the full-frame pass, 0.25 is the old cv_scaler = 4
+        :param target_face: face height in pixels each region is scaled to
+        :param default_face: expected face height in moving regions outside every zone
+        :param track_margin: how far around a known face to search, relative to its size
+        :param max_scale: regions are never enlarged beyond this
+        :param max_coverage: share of the frame above which a full-frame pass is cheaper than regions
+        :param motion: also search where the picture changed
+        :param upsample: the full-frame pass is enlarged this many times by 2, like HOG's
+            number_of_times_to_upsample, regions are already scaled to target_face
+        :param backend: face detector run on every region, see utils.face_detectors. HOG without
+            upsampling if None, a backend that upsamples itself scans 4 times the pixels per upsample
+        """
+        self.zones = list(zones)
+        self.full_frame_every = full_frame_every
+        self.full_frame_scale = full_frame_scale
+        self.target_face = target_face
+        self.default_face = default_face
+        self.track_margin = track_margin
+        self.max_scale = max_scale
+        self.max_coverage = max_coverage
+        self.upsample = upsample
+        self.backend = backend if backend is not None else HogFaceDetector(upsample=0)
+        self.motion_gate = MotionGate() if motion else None
+
+        self.frame_index = 0
+        self._last_full = None
+        self._faces = []
+
+        # Cost bookkeeping, pixels handed to the backend
+        self.full_passes = 0
+        self.region_passes = 0
+        self.pixels_scanned = 0
+        self.frames = 0
+
+    def _expected_face(self, x, y):
+        for zone_x, zone_y, zone_w, zone_h, expected in self.zones:
+            if zone_x <= x < zone_x + zone_w and zone_y <= y < zone_y + zone_h:
+                return expected
+        return self.default_face
+
+    def _scale_for(self, expected_face):
+        return min(self.max_scale, self.target_face / max(expected_face, 1))
+
+    def _candidate_regions(self, frame):
+        """(x0, y0, x1, y1, expected_face) regions worth searching in this frame."""
+        regions = []
+        for top, right, bottom, left in self._faces:
+            size = max(bottom - top, right - left)
+            margin = int(size * self.track_margin)
+            regions.append((left - margin, top - margin, right + margin, bottom + margin, size))
+        if self.motion_gate is not None:
+            self.motion_gate.check(frame)
+            for x, y, w, h in self.motion_gate.regions():
+                # A face already found there tells the size better than the zone does
+                known = [bottom - top for top, right, bottom, left in self._faces
+                         if left < x + w and x < right and top < y + h and y < bottom]
+                expected = min(known) if known else self._expected_face(x + w // 2, y + h // 2)
+                regions.append((x, y, x + w, y + h, expected))
+
+        # Clip to the frame and merge overlapping regions, keeping the smallest expected face
+        height, width = frame.shape[:2]
+        regions = [(max(0, x0), max(0, y0), min(width, x1), min(height, y1), expected)
+                   for x0, y0, x1, y1, expected in regions]
+        regions = [region for region in regions if region[2] > region[0] and region[3] > region[1]]
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(regions)):
+                for j in range(i + 1, len(regions)):
+                    a, b = regions[i], regions[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        regions[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]),
+                                      min(a[4], b[4]))
+                        del regions[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return regions
+
+    def _detect_region(self, frame, region, scale):
+        x0, y0, x1, y1 = region
+        crop = frame[y0:y1, x0:x1]
+        if scale != 1.0:
+            crop = cv2.resize(crop, (0, 0), fx=scale, fy=scale,
+                              interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR)
+        self.pixels_scanned += crop.shape[0] * crop.shape[1]
+        locations = self.backend.detect(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        # Back to full-frame pixels
+        return [(int(top / scale) + y0, int(right / scale) + x0, int(bottom / scale) + y0, int(left / scale) + x0)
+                for top, right, bottom, left in locations]
+
+    def detect(self, frame):
+        """Find faces in a full-resolution BGR frame, which is not modified.
+        :return: (top, right, bottom, left) boxes in full-frame pixels
+        """
+        self.frame_index += 1
+        self.frames += 1
+        height, width = frame.shape[:2]
+        regions = self._candidate_regions(frame)
+        coverage = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1, _ in regions) / (width * height)
+        full_due = self._last_full is None or self.frame_index - self._last_full >= self.full_frame_every
+
+        locations = []
+        if full_due or coverage > self.max_coverage:
+            self.full_passes += 1
+            self._last_full = self.frame_index
+            locations += self._detect_region(frame, (0, 0, width, height),
+                                             self.full_frame_scale * 2 ** self.upsample)
+            # Anything that needs a finer scale than the full-frame pass is still searched on its own,
+            # which is the only time whole zones are scanned
+            regions += [(x, y, x + w, y + h, expected) for x, y, w, h, expected in self.zones]
+            regions = [region for region in regions
+                       if self._scale_for(region[4]) > self.full_frame_scale * 2 ** self.upsample * 1.5]
+        for x0, y0, x1, y1, expected in regions:
+            self.region_passes += 1
+            locations += self._detect_region(frame, (x0, y0, x1, y1), self._scale_for(expected))
+
+        # Overlapping regions can find the same face twice
+        faces = []
+        for location in locations:
+            if all(box_iou(location, face) < 0.3 for face in faces):
+                faces.append(location)
+        self._faces = faces
+        return faces
+
+    @property
+    def mean_pixels(self):
+        """Pixels scanned per frame on average, the fixed downscale scans width * height * scale ** 2 * 4 ** upsample."""
+        return self.pixels_scanned / self.frames if self.frames else 0.0
+
+    def metrics(self):
+        return {
+            "frames": self.frames,
+            "full_passes": self.full_passes,
+            "region_passes": self.region_passes,
+            "mean_pixels": int(self.mean_pixels),
+        }
@@ -0,0 +1,167 @@
+import threading
+import time
+import cv2
+import numpy as np
+import mediapipe as mp
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+
+
+class AsyncDetectionDriver:
+    """Backpressured wrapper around MediaPipe's ObjectDetector.detect_async.
+
+    At most max_in_flight frames are handed to the detector at once, frames
+    offered while it is busy are dropped instead of queued. Every result is
+    paired with the exact frame it was computed on, so boxes are always drawn
+    on the image they belong to.
+    """
+
+    def __init__(self, model="models/efficientdet_lite0.tflite", max_results=5, score_threshold=0.25,
+                 max_in_flight=1, fps_avg_frame_count=10, result_timeout=1.0):
+        """
+        :param model: path of the TFLite detection model
+        :param max_results: most detections returned per frame
+        :param score_threshold: lowest score a detection needs to be returned
+        :param max_in_flight: frames the detector may be working on at the same time
+        :param fps_avg_frame_count: results averaged for the fps figure
+        :param result_timeout: seconds after which a frame without a result stops counting as in flight
+        """
+        self.model = model
+        self.max_results = max_results
+        self.score_threshold = score_threshold
+        self.max_in_flight = max_in_flight
+        self.result_timeout = result_timeout
+        self.fps_avg_frame_count = fps_avg_frame_count
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._latest = None
+        self._last_timestamp = 0
+        self._timestamp_offset = 0
+        self._rgb = None
+
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.results_received = 0
+        self.fps = 0.0
+        self._fps_start = time.time()
+
+        base_options = python.BaseOptions(model_asset_path=model)
+        options = vision.ObjectDetectorOptions(base_options=base_options,
+                                               running_mode=vision.RunningMode.LIVE_STREAM,
+                                               max_results=max_results, score_threshold=score_threshold,
+                                               result_callback=self._on_result)
+        self.detector = vision.ObjectDetector.create_from_options(options)
+
+    def submit(self, frame, timestamp_ms=None):
+        """Offer a BGR frame to the detector.
+        The frame is kept until its result arrives, the caller must not draw on it.
+        :param timestamp_ms: frame timestamp, defaults to the current time
+        :return: True if the frame was sent, False if it was dropped because the detector is busy
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._forget_lost(now)
+            if len(self._in_flight) >= self.max_in_flight:
+                self.frames_dropped += 1
+                return False
+            # detect_async needs strictly increasing timestamps
+            if timestamp_ms is None:
+                timestamp_ms = time.time_ns() // 1_000_000
+            # A clock that starts over, such as a second replay or a live stream after a replay,
+            # is shifted once so its timestamps keep their spacing
+            if timestamp_ms + self._timestamp_offset <= self._last_timestamp:
+                self._timestamp_offset = self._last_timestamp + 1 - timestamp_ms
+            timestamp_ms += self._timestamp_offset
+            self._last_timestamp = timestamp_ms
+            self._in_flight[timestamp_ms] = (frame, now)
+            self.frames_submitted += 1
+
+        # Convert the image from BGR to RGB as required by the TFLite model, into a reused
+        # buffer since mp.Image copies the pixels anyway
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self._rgb)
+        self.detector.detect_async(mp_image, timestamp_ms)
+        return True
+
+    def warm_up(self, shape=(480, 640, 3), runs=2, timeout=10.0):
+        """Run the detector on synthetic frames and wait for each result.
+        The first inferences are much slower than later ones, mostly loading the
+        model and setting up the TFLite runtime, and this is the detector that
+        serves the page. Call it before the first submit(). The frames are stamped
+        0, 1, ... so they stay below every live timestamp, a replay starting at 0
+        is then shifted past them by the same amount on every run. Results are
+        discarded and the counters reset, so the page starts from a clean state.
+        :param shape: shape of the frames that will be submitted
+        :return: seconds until each result arrived
+        """
+        with self._lock:
+            self._last_timestamp = -1
+            self._timestamp_offset = 0
+        rng = np.random.default_rng(0)
+        timings = []
+        for index in range(runs):
+            frame = rng.integers(0, 256, shape, dtype=np.uint8)
+            received = self.results_received
+            started = time.monotonic()
+            while not self.submit(frame, timestamp_ms=index) and time.monotonic() - started < timeout:
+                time.sleep(0.01)
+            while self.results_received == received and time.monotonic() - started < timeout:
+                time.sleep(0.005)
+            timings.append(time.monotonic() - started)
+
+        with self._lock:
+            # Whatever came back late, the stream continues after the warm-up range
+            self._in_flight.clear()
+            self._last_timestamp = runs - 1
+            self._timestamp_offset = 0
+            self._latest = None
+            self.frames_submitted = 0
+            self.frames_dropped = 0
+            self.results_received = 0
+            self.fps = 0.0
+            self._fps_start = time.time()
+        return timings
+
+    def _forget_lost(self, now):
+        # Frames the detector silently dropped would otherwise block the driver forever
+        for lost in [ts for ts, (_, sent) in self._in_flight.items() if now - sent > self.result_timeout]:
+            del self._in_flight[lost]
+
+    def _on_result(self, result, unused_output_image, timestamp_ms):
+        with self._lock:
+            entry = self._in_flight.pop(timestamp_ms, None)
+            if entry is None:
+                return
+            self._latest = (entry[0], result, timestamp_ms)
+
+            # Calculate the FPS
+            self.results_received += 1
+            if self.results_received % self.fps_avg_frame_count == 0:
+                now = time.time()
+                self.fps = self.fps_avg_frame_count / (now - self._fps_start)
+                self._fps_start = now
+
+    def take(self):
+        """Take the newest (frame, result) pair, or (None, None) if none arrived since the last call."""
+        with self._lock:
+            latest, self._latest = self._latest, None
+        if latest is None:
+            return None, None
+        return latest[0], latest[1]
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            self._forget_lost(time.monotonic())
+            return len(self._in_flight)
+
+    @property
+    def busy(self):
+        """True when a submitted frame would be dropped, callers can skip preparing one."""
+        return self.in_flight >= self.max_in_flight
+
+    def close(self):
+        self.detector.close()
@@ -0,0 +1,162 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+import dlib
+import numpy as np
+from face_recognition import api as face_api
+
+
+def _encode_chips_in_process(chips, num_jitters):
+    # Runs in a ProcessEncoder worker, importing this module there loads face_recognition's models
+    descriptors = face_api.face_encoder.compute_face_descriptor(chips, num_jitters)
+    return [np.array(descriptor) for descriptor in descriptors]
+
+
+class ProcessEncoder:
+    """Encodes faces from many frames and cameras in batches, in worker processes.
+
+    dlib's encoder holds the GIL for the whole call, about 130 ms per face on
+    the Pi, so encoding on a thread still stalls every other Python thread,
+    the Qt UI thread included. Here callers hand in an image and its face
+    locations and get a Future back. Each face is aligned to a 150x150 chip on
+    the caller's thread, a few milliseconds of landmark search, and a single
+    thread collects chips until max_batch faces are waiting or the oldest one
+    has waited max_wait seconds. The whole batch goes to a worker process in
+    one call and through the network in one pass, while the caller waits
+    without holding the GIL. At most one batch per worker is in flight, faces
+    arriving meanwhile join the next batch. The encodings are the same as
+    face_encodings gives. Each worker loads its own copy of the models, about
+    100 MB.
+
+    max_wait is the latency/throughput knob: 0 still batches the faces of one
+    frame and whatever arrives while the workers are busy, larger values also
+    wait for other frames and cameras at the cost of up to that much latency.
+    """
+
+    def __init__(self, workers=1, max_batch=16, max_wait=0.0, model="large", num_jitters=1):
+        """
+        :param workers: encoder processes
+        :param max_batch: faces encoded in one pass at most
+        :param max_wait: seconds the first face of a batch may wait for more
+        :param model: landmark model used for alignment when submit() is not given one,
+            "large" (68 points) or "small" (5 points)
+        :param num_jitters: times to re-sample each face, 1 means no jitter
+        """
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.model = model
+        self.num_jitters = num_jitters
+        # Spawned rather than forked, a fork of the GUI process would copy locks held by its threads
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+        self._condition = threading.Condition()
+        self._pending = []
+        self._pending_faces = 0
+        self._in_flight = 0
+        self._running = True
+
+        self.batches = 0
+        self.faces_encoded = 0
+
+        self._thread = threading.Thread(target=self._run, name="process encoder", daemon=True)
+        self._thread.start()
+
+    def submit(self, rgb_image, face_locations, model=None):
+        """Queue the faces of one RGB image for encoding.
+        :param face_locations: (top, right, bottom, left) boxes in rgb_image
+        :param model: landmark model for these faces, the encoder's own if None
+        :return: Future resolving to a list of encodings in the order of face_locations
+        """
+        future = Future()
+        if len(face_locations) == 0:
+            future.set_result([])
+            return future
+
+        # Align every face to the chip the encoder expects, as compute_face_descriptor does itself.
+        # Only the chips are sent to the worker, not the whole image
+        landmarks = face_api._raw_face_landmarks(rgb_image, face_locations, model or self.model)
+        chips = [dlib.get_face_chip(rgb_image, shape, size=150, padding=0.25) for shape in landmarks]
+
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("ProcessEncoder is closed")
+            self._pending.append((chips, future, time.monotonic()))
+            self._pending_faces += len(chips)
+            self._condition.notify_all()
+        return future
+
+    def encode(self, rgb_image, face_locations, model=None):
+        """Blocking version of submit, a drop-in for face_recognition.face_encodings."""
+        return self.submit(rgb_image, face_locations, model).result()
+
+    @property
+    def mean_batch_size(self):
+        return self.faces_encoded / self.batches if self.batches else 0.0
+
+    def _take_batch(self):
+        with self._condition:
+            # A batch only leaves once a worker is free for it, until then it keeps growing
+            while self._running and (not self._pending or self._in_flight >= self.workers):
+                self._condition.wait()
+            if not self._pending:
+                return []
+            # Wait for more faces until the batch is full or the oldest request has waited long enough
+            deadline = self._pending[0][2] + self.max_wait
+            while self._running and self._pending_faces < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            # Whole requests only, a frame's faces are never split over two batches
+            batch, faces = [], 0
+            while self._pending and (not batch or faces + len(self._pending[0][0]) <= self.max_batch):
+                request = self._pending.pop(0)
+                batch.append(request)
+                faces += len(request[0])
+            self._pending_faces -= faces
+            self._in_flight += 1
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            chips = [chip for request_chips, _, _ in batch for chip in request_chips]
+            try:
+                result = self._pool.submit(_encode_chips_in_process, chips, self.num_jitters)
+            except Exception as e:
+                self._finish(batch, None, e)
+                continue
+            result.add_done_callback(lambda done, batch=batch: self._finish(batch, done))
+
+    def _finish(self, batch, done, error=None):
+        """Hand a batch's encodings, or its error, to the futures of its requests."""
+        if error is None:
+            error = done.exception()
+        with self._condition:
+            self._in_flight -= 1
+            if error is None:
+                self.batches += 1
+                self.faces_encoded += sum(len(request_chips) for request_chips, _, _ in batch)
+            self._condition.notify_all()
+        if error is not None:
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+        encodings = done.result()
+        start = 0
+        for request_chips, future, _ in batch:
+            future.set_result(encodings[start:start + len(request_chips)])
+            start += len(request_chips)
+
+    def close(self):
+        """Encode what is still queued and stop the thread and the workers."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._pool.shutdown()
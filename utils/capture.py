@@ -0,0 +1,203 @@
+import threading
+import time
+import cv2
+from utils.stream_health import StreamHealthMonitor
+
+
+class LatestFrameCapture:
+    """cv2.VideoCapture that decodes on a background thread.
+
+    The reader thread keeps only the newest frame in a single slot, so consumers
+    never block on the network and never see frames that queued up in the
+    decoder. It exposes the same read/isOpened/set/release calls as
+    cv2.VideoCapture, but read() hands every frame out only once: it returns
+    (False, None) when no new frame arrived since the last call, and the caller
+    owns the returned frame and may draw on it.
+
+    The reader thread also reconnects the stream when its StreamHealthMonitor
+    reports it broken or stalled, with exponential backoff between attempts.
+
+    With a target_fps the reader grab()s every frame to stay current but only
+    retrieve()s (converts and copies) frames at that rate, so the work after
+    demuxing and decoding follows the frames consumers use rather than the
+    camera's frame rate.
+    """
+
+    # A live stream, see ReplayCapture
+    replayed = False
+
+    def __init__(self, source, width=None, height=None, buffer_size=1, timeout_ms=5000, health=None,
+                 target_fps=None):
+        """
+        :param source: RTSP URL, file path or camera index passed to cv2.VideoCapture
+        :param width: requested frame width, if any
+        :param height: requested frame height, if any
+        :param buffer_size: decoder-side buffer size, kept small to avoid stale video
+        :param timeout_ms: open/read timeout so a stalled network read returns control
+        :param health: StreamHealthMonitor deciding when to reconnect
+        :param target_fps: rate frames are retrieved at, None retrieves every frame
+        """
+        self.source = source
+        self.width = width
+        self.height = height
+        self.buffer_size = buffer_size
+        self.timeout_ms = timeout_ms
+        self.health = health or StreamHealthMonitor()
+        self.target_fps = target_fps
+        self._next_retrieve = 0.0
+        self.cap = self._open()
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_index = 0
+        self._read_index = 0
+        self._frame_time = None
+        self._opened_at = time.monotonic()
+
+        # Counters, frames_dropped are frames overwritten before anyone read them,
+        # frames_grabbed counts every frame taken off the stream, retrieved or not
+        self.frames_grabbed = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        # Older OpenCV builds have no timeout properties, they just block longer
+        params = []
+        for prop in ("CAP_PROP_OPEN_TIMEOUT_MSEC", "CAP_PROP_READ_TIMEOUT_MSEC"):
+            if hasattr(cv2, prop):
+                params += [getattr(cv2, prop), self.timeout_ms]
+        cap = cv2.VideoCapture(self.source, cv2.CAP_ANY, params) if params else cv2.VideoCapture(self.source)
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return cap
+
+    def _reconnect(self):
+        self.health.record_reconnect()
+        print(f"[INFO] reconnecting camera stream, health: {self.health.metrics()}")
+        self.cap.release()
+        self.cap = self._open()
+
+    def _reader(self):
+        # The reader thread owns the capture: it is only read, reopened and released here,
+        # so release() never closes it under a blocked read or a reconnect
+        try:
+            self._read_loop()
+        finally:
+            self.cap.release()
+
+    def _read_loop(self):
+        while self._running:
+            if self.health.should_reconnect():
+                self._reconnect()
+            if not self.cap.isOpened():
+                time.sleep(0.1)
+                continue
+
+            start = time.monotonic()
+            ok, frame = self._read_frame()
+            if not ok:
+                self.read_failures += 1
+                self.health.record_failure()
+                time.sleep(0.01)
+                continue
+            self.health.record_frame(time.monotonic() - start)
+            self.frames_grabbed += 1
+            if frame is None:
+                # Grabbed to keep the stream current but not converted, see target_fps
+                continue
+            with self._lock:
+                if self._read_index < self._frame_index:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._frame_index += 1
+                self._frame_time = time.monotonic()
+                self.frames_read += 1
+
+    def _read_frame(self):
+        target_fps = self.target_fps
+        if not target_fps:
+            return self.cap.read()
+        if not self.cap.grab():
+            return False, None
+        now = time.monotonic()
+        if now < self._next_retrieve:
+            return True, None
+        # Paced from the previous slot rather than from now, so the frames kept average out
+        # to target_fps even though they only arrive at the camera's frame interval
+        interval = 1.0 / target_fps
+        self._next_retrieve += interval
+        if self._next_retrieve <= now:
+            # First frame or the stream stalled, start over instead of catching up
+            self._next_retrieve = now + interval
+        return self.cap.retrieve()
+
+    def set_target_fps(self, fps):
+        """Change the retrieve rate while running, None retrieves every frame."""
+        self.target_fps = fps
+        self._next_retrieve = 0.0
+
+    def read(self):
+        """Take the newest frame without blocking.
+        :return: (ok, frame), ok is False when no new frame arrived since the last read
+        """
+        with self._lock:
+            if self._read_index == self._frame_index:
+                return False, None
+            self._read_index = self._frame_index
+            return True, self._frame
+
+    def latest(self):
+        """Peek at the newest frame without taking it, for fan-out to several consumers.
+        :return: (index, frame), index increases with every decoded frame and frame is None before the first one
+        """
+        with self._lock:
+            return self._frame_index, self._frame
+
+    def timestamp_ms(self, index):
+        """Live frames have no timestamp of their own, consumers stamp them with the clock.
+        ReplayCapture returns deterministic ones instead.
+        """
+        return None
+
+    @property
+    def frame_age(self):
+        """Seconds since the newest frame was decoded, None before the first frame."""
+        with self._lock:
+            if self._frame_time is None:
+                return None
+            return time.monotonic() - self._frame_time
+
+    def is_stale(self, max_age=2.0):
+        """True when no frame has arrived for more than max_age seconds."""
+        with self._lock:
+            last = self._frame_time if self._frame_time is not None else self._opened_at
+        return time.monotonic() - last > max_age
+
+    def metrics(self):
+        """Frame counters plus the health monitor's restarts, downtime and decode time."""
+        return dict(self.health.metrics(), frames_grabbed=self.frames_grabbed, frames_read=self.frames_read,
+                    frames_dropped=self.frames_dropped, read_failures=self.read_failures)
+
+    def isOpened(self):
+        return self._running and self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        """Stop the reader thread, which releases the capture on its way out.
+        A read or reconnect can block for up to timeout_ms, the wait here is shorter
+        and the thread finishes releasing on its own after that.
+        """
+        self._running = False
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
@@ -1,5 +1,3 @@
-from pymodbus.client import ModbusTcpClient
-
 class RobotController:
     def __init__(self, ip_address = "192.168.0.2", port=502):
         """
@@ -17,6 +15,8 @@ class RobotController:
         Establish connection to the robot controller.
         """
         if not self.client:
+            # Imported here so the GUI does not load pymodbus until the robot is actually used
+            from pymodbus.client import ModbusTcpClient
             self.client = ModbusTcpClient(self.ip_address, port=self.port)
         self.connected = self.client.connect()
         if not self.connected:
@@ -0,0 +1,84 @@
+"""Versioned on-disk store for the known face encodings.
+
+The store is a single file, encodings.bin: a fixed header, a section table
+and contiguous little-endian arrays. Every section is a plain C-ordered array
+aligned to 64 bytes, so the runtime can map the file once with np.memmap and
+hand out zero-copy views. Pages are shared between every process that opens
+the same file read-only.
+
+The identity name table is stored as UTF-8 JSON in the "identities" section,
+so labels and names are always replaced together.
+"""
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"FACEENC\x00"
+VERSION = 2
+ALIGNMENT = 64
+IDENTITIES = "identities"  # section holding the identity name table
+
+_HEADER = struct.Struct("<8sII")            # magic, version, section count
+_SECTION = struct.Struct("<16s8sQQQ")       # name, dtype, rows, cols, offset
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_store(path, identities, **sections):
+    """Write arrays and the identity table, replacing any previous store.
+    :param path: encodings file to write, e.g. utils/encodings.bin
+    :param identities: list of identity names, indexed by label
+    :param sections: named 1-d or 2-d arrays to store
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in sections.items()}
+    names = json.dumps({"version": VERSION, "identities": list(identities)}).encode()
+    arrays[IDENTITIES] = np.frombuffer(names, dtype=np.uint8)
+
+    offset = _align(_HEADER.size + _SECTION.size * len(arrays))
+    table = []
+    for name, array in arrays.items():
+        rows = array.shape[0]
+        cols = array.shape[1] if array.ndim == 2 else 0
+        dtype = array.dtype.newbyteorder("<").str
+        table.append(_SECTION.pack(name.encode(), dtype.encode(), rows, cols, offset))
+        offset = _align(offset + array.nbytes)
+
+    # Write to a temporary file and swap it in so readers never see half a store
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(arrays)))
+        f.writelines(table)
+        for array in arrays.values():
+            f.seek(_align(f.tell()))
+            f.write(array.astype(array.dtype.newbyteorder("<"), copy=False).data)
+        f.truncate(_align(f.tell()))
+    os.replace(tmp_path, path)
+
+
+def open_store(path):
+    """Map a store read-only without copying it into memory.
+    :return: (identities, sections) where sections maps name -> read-only array view
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a face encodings store")
+    if version != VERSION:
+        # Version 1 kept the identity table outside the file
+        raise ValueError(f"{path} has store version {version}, expected {VERSION}, "
+                         f"re-run utils/model_training.py to rebuild it")
+
+    sections = {}
+    for i in range(count):
+        name, dtype, rows, cols, offset = _SECTION.unpack_from(data, _HEADER.size + i * _SECTION.size)
+        shape = (rows, cols) if cols else (rows,)
+        sections[name.rstrip(b"\x00").decode()] = np.ndarray(
+            shape, dtype=np.dtype(dtype.rstrip(b"\x00").decode()), buffer=data, offset=offset)
+
+    if IDENTITIES not in sections:
+        raise ValueError(f"{path} has no identity table, re-run utils/model_training.py to rebuild it")
+    identities = json.loads(sections.pop(IDENTITIES).tobytes())["identities"]
+    return identities, sections
@@ -0,0 +1,114 @@
+import threading
+import numpy as np
+import face_recognition
+
+# face_recognition keeps one HOG and one CNN detector per process. They release the GIL and
+# are not safe to run from two threads at once, so every call in the process goes through this lock.
+dlib_detector_lock = threading.Lock()
+
+
+def face_locations(rgb_frame, upsample=1, model="hog"):
+    """face_recognition.face_locations, serialized with every other dlib detector call."""
+    with dlib_detector_lock:
+        return face_recognition.face_locations(rgb_frame, number_of_times_to_upsample=upsample, model=model)
+
+
+class HogFaceDetector:
+    """dlib's HOG detector, what face_recognition.face_locations uses by default.
+
+    Cheap on a CPU and finds faces from about 80 pixels high, smaller ones
+    only with upsampling, which quadruples the pixels scanned each time.
+    """
+
+    name = "hog"
+
+    def __init__(self, upsample=1):
+        """
+        :param upsample: number_of_times_to_upsample, 1 finds faces down to about 40 pixels
+        """
+        self.upsample = upsample
+
+    def detect(self, rgb_frame):
+        """Find faces in an RGB frame.
+        :return: (top, right, bottom, left) boxes in the frame's pixels
+        """
+        return face_locations(rgb_frame, self.upsample, model="hog")
+
+
+class CnnFaceDetector(HogFaceDetector):
+    """dlib's CNN (MMOD) detector.
+
+    Finds turned and partly hidden faces HOG misses, but without a CUDA build
+    of dlib it is several times slower than HOG, so it suits enrollment more
+    than live video.
+    """
+
+    name = "cnn"
+
+    def detect(self, rgb_frame):
+        return face_locations(rgb_frame, self.upsample, model="cnn")
+
+
+class MediaPipeFaceDetector:
+    """MediaPipe BlazeFace, the fastest of the three on a CPU.
+
+    The frame is scaled to the model's 128x128 input internally, so the cost
+    hardly depends on the frame size. The short range model is meant for
+    faces within about two metres of the camera. Its boxes are converted to
+    (top, right, bottom, left) and clipped to the frame, so face_encodings and
+    draw_results take them as they are.
+    """
+
+    name = "mediapipe"
+
+    def __init__(self, model="models/blaze_face_short_range.tflite", min_confidence=0.5):
+        """
+        :param model: path of the BlazeFace TFLite model
+        :param min_confidence: lowest score a detection needs to be returned
+        """
+        # Imported here so the face pages do not need MediaPipe unless this backend is picked
+        import mediapipe as mp
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+
+        self._mp = mp
+        self._lock = threading.Lock()
+        base_options = python.BaseOptions(model_asset_path=model)
+        options = vision.FaceDetectorOptions(base_options=base_options,
+                                             running_mode=vision.RunningMode.IMAGE,
+                                             min_detection_confidence=min_confidence)
+        self.detector = vision.FaceDetector.create_from_options(options)
+
+    def detect(self, rgb_frame):
+        height, width = rgb_frame.shape[:2]
+        with self._lock:
+            # MediaPipe needs a contiguous buffer, crops and views are copied
+            mp_image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_frame))
+            result = self.detector.detect(mp_image)
+        locations = []
+        for detection in result.detections:
+            box = detection.bounding_box
+            top, left = max(0, box.origin_y), max(0, box.origin_x)
+            bottom, right = min(height, box.origin_y + box.height), min(width, box.origin_x + box.width)
+            if bottom > top and right > left:
+                locations.append((top, right, bottom, left))
+        return locations
+
+    def close(self):
+        self.detector.close()
+
+
+FACE_DETECTORS = {
+    HogFaceDetector.name: HogFaceDetector,
+    CnnFaceDetector.name: CnnFaceDetector,
+    MediaPipeFaceDetector.name: MediaPipeFaceDetector,
+}
+
+
+def create_face_detector(name="hog", **kwargs):
+    """Build a face detector backend by name, "hog", "cnn" or "mediapipe".
+    :param kwargs: passed on to the backend's constructor
+    """
+    if name not in FACE_DETECTORS:
+        raise ValueError(f"Unknown face detector {name!r}, use one of {', '.join(FACE_DETECTORS)}")
+    return FACE_DETECTORS[name](**kwargs)
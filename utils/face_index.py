@@ -0,0 +1,221 @@
+import pickle
+import numpy as np
+from utils.encoding_store import open_store, write_store
+
+
+def face_distances(face_encodings, known_encodings):
+    """Euclidean distance between every face and every known encoding.
+    :return: (faces x known) distance matrix
+    """
+    faces = np.asarray(face_encodings, dtype=np.float32)
+    known = np.asarray(known_encodings, dtype=np.float32)
+
+    # ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, one matrix product for every pair
+    sq_dist = (np.einsum("ij,ij->i", faces, faces)[:, None]
+               + np.einsum("ij,ij->i", known, known)[None, :]
+               - 2.0 * faces @ known.T)
+    np.maximum(sq_dist, 0.0, out=sq_dist)
+    return np.sqrt(sq_dist, out=sq_dist)
+
+
+def _kmeans(rows, k, iterations=5):
+    """Tiny deterministic k-means used to summarise one identity."""
+    centers = rows[np.linspace(0, len(rows) - 1, k).astype(int)].copy()
+    for _ in range(iterations):
+        assignment = np.argmin(face_distances(rows, centers), axis=1)
+        for c in range(k):
+            members = rows[assignment == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return centers
+
+
+class FaceIndex:
+    """Nearest-neighbour index over the known face encodings.
+
+    Small galleries are searched exactly. Larger galleries are searched through
+    a few k-means prototypes per identity: the closest identities are shortlisted
+    on their prototypes and then re-ranked exactly on all of their encodings.
+    When there are many prototypes they are grouped into coarse cells and only
+    the cells nearest to the face are scanned.
+    """
+
+    def __init__(self, encodings=None, names=None, prototypes_per_identity=4,
+                 candidates=8, exact_threshold=2048, probes=8):
+        """
+        :param encodings: known face encodings (N x 128)
+        :param names: identity name for each encoding
+        :param prototypes_per_identity: k-means centres kept per identity
+        :param candidates: identities re-ranked exactly for each face
+        :param exact_threshold: galleries up to this size are searched exactly
+        :param probes: coarse cells scanned per face on large galleries
+        """
+        self.prototypes_per_identity = prototypes_per_identity
+        self.candidates = candidates
+        self.exact_threshold = exact_threshold
+        self.probes = probes
+
+        self.encodings = np.empty((0, 128), dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.int32)
+        self.identities = []
+        self.prototypes = np.empty((0, 128), dtype=np.float32)
+        self.prototype_labels = np.empty(0, dtype=np.int32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self.cells = np.empty((0, 128), dtype=np.float32)
+        self._cell_offsets = np.zeros(1, dtype=np.int64)
+
+        if encodings is not None and len(encodings):
+            self.add(encodings, names)
+
+    def __len__(self):
+        return len(self.encodings)
+
+    @property
+    def names(self):
+        """Identity name of every encoding, in index order."""
+        return [self.identities[label] for label in self.labels]
+
+    def add(self, encodings, names):
+        """Add encodings with their identity names and rebuild the prototypes."""
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, self.encodings.shape[1])
+        if len(encodings) != len(names):
+            raise ValueError(f"Got {len(encodings)} encodings but {len(names)} names")
+
+        lookup = {name: label for label, name in enumerate(self.identities)}
+        for name in names:
+            if name not in lookup:
+                lookup[name] = len(self.identities)
+                self.identities.append(name)
+        labels = np.array([lookup[name] for name in names], dtype=np.int32)
+
+        # Keep every identity contiguous so it can be re-ranked with a slice
+        all_labels = np.concatenate([self.labels, labels])
+        order = np.argsort(all_labels, kind="stable")
+        self.encodings = np.ascontiguousarray(np.concatenate([self.encodings, encodings])[order])
+        self.labels = all_labels[order]
+        self._build_prototypes()
+
+    def _build_prototypes(self):
+        counts = np.bincount(self.labels, minlength=len(self.identities))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        prototypes, prototype_labels = [], []
+        for label in range(len(self.identities)):
+            rows = self.encodings[self._offsets[label]:self._offsets[label + 1]]
+            if len(rows) == 0:
+                continue
+            k = min(self.prototypes_per_identity, len(rows))
+            centers = rows if k == len(rows) else _kmeans(rows, k)
+            prototypes.append(centers)
+            prototype_labels.extend([label] * len(centers))
+
+        self.prototypes = (np.concatenate(prototypes) if prototypes
+                           else np.empty((0, self.encodings.shape[1]), dtype=np.float32))
+        self.prototype_labels = np.array(prototype_labels, dtype=np.int32)
+        self._build_cells()
+
+    def _build_cells(self):
+        # Too few prototypes to be worth partitioning, scan them all
+        if len(self.prototypes) <= self.exact_threshold:
+            self.cells = self.prototypes[:0]
+            self._cell_offsets = np.array([0, len(self.prototypes)])
+            return
+
+        sample = self.prototypes[::max(1, len(self.prototypes) // (16 * self.exact_threshold))]
+        self.cells = _kmeans(sample, int(np.sqrt(len(self.prototypes))))
+        assignment = np.argmin(face_distances(self.prototypes, self.cells), axis=1)
+
+        # Keep every cell contiguous so it can be scanned with a slice
+        order = np.argsort(assignment, kind="stable")
+        self.prototypes = np.ascontiguousarray(self.prototypes[order])
+        self.prototype_labels = self.prototype_labels[order]
+        counts = np.bincount(assignment, minlength=len(self.cells))
+        self._cell_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def search(self, face_encodings, tolerance=0.6):
+        """Find the closest known identity for every face.
+        :param face_encodings: encodings of the faces found in a frame
+        :param tolerance: largest distance still counted as a match
+        :return: (names, distances), unmatched faces are named "Unknown"
+        """
+        if len(face_encodings) == 0:
+            return [], np.empty(0, dtype=np.float32)
+        if len(self) == 0:
+            return ["Unknown"] * len(face_encodings), np.full(len(face_encodings), np.inf, dtype=np.float32)
+
+        faces = np.asarray(face_encodings, dtype=np.float32)
+        if len(self) <= self.exact_threshold or len(self.identities) <= self.candidates:
+            best_index, best_distance = self._search_exact(faces)
+        else:
+            best_index, best_distance = self._search_prototypes(faces)
+
+        names = [self.identities[self.labels[index]] if distance <= tolerance else "Unknown"
+                 for index, distance in zip(best_index, best_distance)]
+        return names, best_distance
+
+    def _search_exact(self, faces):
+        distances = face_distances(faces, self.encodings)
+        best_index = np.argmin(distances, axis=1)
+        return best_index, distances[np.arange(len(faces)), best_index]
+
+    def _search_prototypes(self, faces):
+        if len(self.cells):
+            nearest_cells = np.argsort(face_distances(faces, self.cells), axis=1)[:, :self.probes]
+
+        best_index = np.empty(len(faces), dtype=np.int64)
+        best_distance = np.empty(len(faces), dtype=np.float32)
+        for i, face in enumerate(faces):
+            if len(self.cells):
+                proto_rows = np.concatenate([np.arange(self._cell_offsets[cell], self._cell_offsets[cell + 1])
+                                             for cell in nearest_cells[i]])
+            else:
+                proto_rows = np.arange(len(self.prototypes))
+
+            # Shortlist the identities owning the closest prototypes
+            proto_distances = face_distances(face[None, :], self.prototypes[proto_rows])[0]
+            closest = proto_rows[np.argsort(proto_distances)]
+            closest_labels = self.prototype_labels[closest]
+            _, first_seen = np.unique(closest_labels, return_index=True)
+            shortlist = closest_labels[np.sort(first_seen)][:self.candidates]
+
+            # Exact re-ranking over every encoding of the shortlisted identities
+            rows = np.concatenate([np.arange(self._offsets[label], self._offsets[label + 1])
+                                   for label in shortlist])
+            distances = face_distances(face[None, :], self.encodings[rows])[0]
+            nearest = np.argmin(distances)
+            best_index[i] = rows[nearest]
+            best_distance[i] = distances[nearest]
+        return best_index, best_distance
+
+    def save(self, path):
+        """Write the gallery and its search structures to an encodings store."""
+        write_store(path, self.identities,
+                    encodings=self.encodings.astype(np.float32, copy=False),
+                    labels=self.labels,
+                    offsets=self._offsets.astype(np.int64),
+                    prototypes=self.prototypes,
+                    prototype_labels=self.prototype_labels,
+                    cells=self.cells,
+                    cell_offsets=self._cell_offsets.astype(np.int64))
+
+    @classmethod
+    def open(cls, path, **kwargs):
+        """Map an encodings store written by save() without copying or rebuilding it."""
+        identities, sections = open_store(path)
+        index = cls(**kwargs)
+        index.identities = identities
+        index.encodings = sections["encodings"]
+        index.labels = sections["labels"]
+        index._offsets = sections["offsets"]
+        index.prototypes = sections["prototypes"]
+        index.prototype_labels = sections["prototype_labels"]
+        index.cells = sections["cells"]
+        index._cell_offsets = sections["cell_offsets"]
+        return index
+
+    @classmethod
+    def load_pickle(cls, path, **kwargs):
+        """Build an index from a legacy encodings.pickle file."""
+        with open(path, "rb") as f:
+            data = pickle.loads(f.read())
+        return cls(data["encodings"], data["names"], **kwargs)
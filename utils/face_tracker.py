@@ -0,0 +1,189 @@
+from collections import Counter, deque
+import cv2
+
+
+def box_iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0, bottom - top) * max(0, right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+def create_cv_tracker(kind="KCF"):
+    """Create an OpenCV single-object tracker, or None if this build has none.
+    KCF/CSRT live in different places depending on the OpenCV version and are
+    missing from builds without the contrib modules, MIL is used instead there.
+    """
+    legacy = getattr(cv2, "legacy", None)
+    for name in (kind, "MIL"):
+        for factory in (getattr(cv2, f"Tracker{name}_create", None),
+                        getattr(getattr(cv2, f"Tracker{name}", None), "create", None),
+                        getattr(legacy, f"Tracker{name}_create", None)):
+            if factory is not None:
+                return factory()
+    return None
+
+
+class IdentityCache:
+    """Last encoding and recent identity votes of one tracked face.
+
+    The face is only encoded again when the cached encoding is too old, the box
+    moved or resized a lot since it was taken, or the last match was not
+    confident. Its name is the majority vote over the last few encodings, so a
+    single bad frame does not flip the authorization result.
+    """
+
+    def __init__(self, window=15, ttl=30, min_iou=0.5, confident_distance=0.45):
+        """
+        :param window: number of recent votes the name is decided on
+        :param ttl: frames a cached encoding stays valid
+        :param min_iou: overlap with the encoded box below which the face is re-encoded
+        :param confident_distance: matches further away than this are re-checked every detection
+        """
+        self.ttl = ttl
+        self.min_iou = min_iou
+        self.confident_distance = confident_distance
+        self.votes = deque(maxlen=window)
+        self.encoding = None
+        self.distance = None
+        self.encoded_box = None
+        self.encoded_at = None
+        self.name = "Unknown"
+
+    def needs_encoding(self, box, frame_index):
+        if self.encoding is None:
+            return True
+        return (frame_index - self.encoded_at >= self.ttl
+                or box_iou(box, self.encoded_box) < self.min_iou
+                or self.distance > self.confident_distance)
+
+    def record(self, encoding, name, distance, box, frame_index):
+        self.encoding = encoding
+        self.distance = distance
+        self.encoded_box = box
+        self.encoded_at = frame_index
+        self.votes.append(name)
+
+        # Majority vote, a tie keeps the current name so one bad frame cannot flip it
+        counts = Counter(self.votes)
+        best = max(counts.values())
+        if counts[self.name] < best:
+            self.name = next(vote for vote in reversed(self.votes) if counts[vote] == best)
+
+
+class Track:
+    """One face followed between detections."""
+
+    def __init__(self, track_id, box, frame, tracker_kind, identity):
+        self.id = track_id
+        self.box = box
+        self.identity = identity
+        self.tracker = None
+        self.tracker_kind = tracker_kind
+        self.reset(frame, box)
+
+    @property
+    def name(self):
+        return self.identity.name
+
+    def reset(self, frame, box):
+        """Re-anchor the track on a fresh detection."""
+        self.box = box
+        top, right, bottom, left = box
+        self.tracker = create_cv_tracker(self.tracker_kind)
+        if self.tracker is not None:
+            self.tracker.init(frame, (left, top, right - left, bottom - top))
+
+    def update(self, frame):
+        """Move the box to the face's position in frame. Returns False if the face was lost."""
+        if self.tracker is None:
+            # No OpenCV tracker available, hold the box until the next detection
+            return True
+        ok, (x, y, w, h) = self.tracker.update(frame)
+        if ok:
+            self.box = (int(y), int(x + w), int(y + h), int(x))
+        return ok
+
+
+class FaceTracker:
+    """Detect-then-track bookkeeping for face recognition.
+
+    Full detection and encoding only run every detect_interval frames or when a
+    track is lost. In between, each face is moved by a cheap OpenCV tracker.
+    Every track carries an IdentityCache, so a detection only needs encoding
+    when that cache says so.
+    """
+
+    def __init__(self, detect_interval=10, tracker_kind="KCF", iou_threshold=0.3, **cache_options):
+        """
+        :param detect_interval: frames between two full detections
+        :param tracker_kind: OpenCV tracker to use ("KCF", "CSRT", "MOSSE", ...)
+        :param iou_threshold: minimum overlap for a detection to continue a track
+        :param cache_options: IdentityCache settings (window, ttl, min_iou, confident_distance)
+        """
+        self.detect_interval = detect_interval
+        self.tracker_kind = tracker_kind
+        self.iou_threshold = iou_threshold
+        self.cache_options = cache_options
+        self.tracks = []
+        self.frames_since_detection = detect_interval
+        self.track_lost = False
+        self.frame_index = 0
+        self._next_id = 0
+
+    def needs_detection(self):
+        """True when the next frame should go through full detection."""
+        return self.track_lost or self.frames_since_detection >= self.detect_interval
+
+    def update_detections(self, frame, boxes):
+        """Associate fresh detections with the existing tracks by IoU.
+        Detections that continue a track keep its id and identity, new faces
+        start new tracks and tracks without a detection are dropped.
+        :return: the tracks whose face has to be encoded again
+        """
+        self.frame_index += 1
+        unmatched = list(self.tracks)
+        tracks = []
+        for box in boxes:
+            best = max(unmatched, key=lambda track: box_iou(track.box, box), default=None)
+            if best is not None and box_iou(best.box, box) >= self.iou_threshold:
+                unmatched.remove(best)
+                best.reset(frame, box)
+                tracks.append(best)
+            else:
+                tracks.append(Track(self._next_id, box, frame, self.tracker_kind,
+                                    IdentityCache(**self.cache_options)))
+                self._next_id += 1
+
+        self.tracks = tracks
+        self.frames_since_detection = 0
+        self.track_lost = False
+        return [track for track in tracks if track.identity.needs_encoding(track.box, self.frame_index)]
+
+    def record_identity(self, track, encoding, name, distance):
+        """Store a fresh encoding and its match as a vote for the track."""
+        track.identity.record(encoding, name, distance, track.box, self.frame_index)
+
+    def track(self, frame):
+        """Move every track to the new frame without running detection."""
+        self.frame_index += 1
+        kept = []
+        for track in self.tracks:
+            if track.update(frame):
+                kept.append(track)
+            else:
+                self.track_lost = True
+        self.tracks = kept
+        self.frames_since_detection += 1
+
+    @property
+    def boxes(self):
+        return [track.box for track in self.tracks]
+
+    @property
+    def names(self):
+        return [track.name for track in self.tracks]
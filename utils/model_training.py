@@ -1,31 +1,162 @@
+# Run from the repository root: python -m utils.model_training [--incremental] [--workers N]
 import os
+import time
+import argparse
+import hashlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from imutils import paths
 import face_recognition
-import pickle
 import cv2
+from utils.face_index import FaceIndex
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(UTILS_DIR, "..", "datasets", "face")
+ENCODINGS_PATH = os.path.join(UTILS_DIR, "encodings.bin")
+CACHE_PATH = os.path.join(UTILS_DIR, "enrollment_cache.pickle")
+
+# Cached encodings are only reused when they were made with the same parameters
+ENCODING_PARAMS = {"detection_model": "hog", "encoding_model": "small", "num_jitters": 1}
 
-print("[INFO] start processing faces...")
-imagePaths = list(paths.list_images("../datasets/face"))
-knownEncodings = []
-knownNames = []
 
-for (i, imagePath) in enumerate(imagePaths):
-    print(f"[INFO] processing image {i + 1}/{len(imagePaths)}")
-    name = imagePath.split(os.path.sep)[-2]
-    
-    image = cv2.imread(imagePath)
+def file_hash(path):
+    """SHA-1 of the file content, used as the cache key for an image."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_image(image_path):
+    """Detect every face in an image and return their encodings."""
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"[WARN] unable to read {image_path}, skipping")
+        return []
     rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    
-    boxes = face_recognition.face_locations(rgb, model="hog")
-    encodings = face_recognition.face_encodings(rgb, boxes)
-    
-    for encoding in encodings:
-        knownEncodings.append(encoding)
-        knownNames.append(name)
-
-print("[INFO] serializing encodings...")
-data = {"encodings": knownEncodings, "names": knownNames}
-with open("encodings.pickle", "wb") as f:
-    f.write(pickle.dumps(data))
-
-print("[INFO] Training complete. Encodings saved to 'encodings.pickle'")
\ No newline at end of file
+
+    boxes = face_recognition.face_locations(rgb, model=ENCODING_PARAMS["detection_model"])
+    return face_recognition.face_encodings(rgb, boxes,
+                                           num_jitters=ENCODING_PARAMS["num_jitters"],
+                                           model=ENCODING_PARAMS["encoding_model"])
+
+
+def _init_worker():
+    # Each worker process gets one core, let the pool provide the parallelism
+    cv2.setNumThreads(1)
+
+
+def enroll_images(image_paths, workers=None, chunksize=8):
+    """Encode images on a process pool, returning results in input order.
+    :param image_paths: images to encode
+    :param workers: worker processes, defaults to one per CPU core
+    :param chunksize: images handed to a worker per work item
+    :return: list with the encodings of each image
+    """
+    workers = workers or os.cpu_count() or 1
+    results = []
+    start = time.perf_counter()
+    report_every = max(1, chunksize * workers)
+
+    if workers == 1:
+        mapped = map(encode_image, image_paths)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        mapped = pool.map(encode_image, image_paths, chunksize=chunksize)
+
+    try:
+        for encodings in mapped:
+            results.append(encodings)
+            if len(results) % report_every == 0 or len(results) == len(image_paths):
+                elapsed = time.perf_counter() - start
+                print(f"[INFO] encoded {len(results)}/{len(image_paths)} images "
+                      f"({len(results) / max(elapsed, 1e-6):.1f} images/s, {workers} workers)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
+
+
+def load_cache(path=None):
+    """Load the enrollment cache, or an empty one if it is missing or stale."""
+    empty = {"params": ENCODING_PARAMS, "files": {}, "encodings": {}}
+    if path is None or not os.path.exists(path):
+        return empty
+    with open(path, "rb") as f:
+        cache = pickle.loads(f.read())
+    if cache.get("params") != ENCODING_PARAMS:
+        print("[INFO] encoding parameters changed, ignoring enrollment cache")
+        return empty
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode the face dataset into the gallery store.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only encode new or changed images, reusing the enrollment cache")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for encoding (default: one per CPU core)")
+    parser.add_argument("--chunksize", type=int, default=8,
+                        help="images sent to a worker per work item")
+    args = parser.parse_args()
+
+    print("[INFO] start processing faces...")
+    imagePaths = list(paths.list_images(DATASET_DIR))
+    cache = load_cache(CACHE_PATH if args.incremental else None)
+
+    files = {}
+    digests = []
+    pending = []
+    pending_paths = {}
+
+    for imagePath in imagePaths:
+        relpath = os.path.relpath(imagePath, DATASET_DIR)
+        stat = os.stat(imagePath)
+
+        # Skip re-hashing files whose size and modification time did not change
+        cached = cache["files"].get(relpath)
+        if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime_ns:
+            digest = cached["hash"]
+        else:
+            digest = file_hash(imagePath)
+
+        files[relpath] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest}
+        digests.append(digest)
+        if digest not in cache["encodings"] and digest not in pending_paths:
+            pending.append(digest)
+            pending_paths[digest] = imagePath
+
+    # Only images whose content is not cached yet go through detection and encoding
+    print(f"[INFO] {len(pending)} of {len(imagePaths)} images need encoding")
+    encodings_by_hash = {digest: cache["encodings"][digest]
+                         for digest in digests if digest in cache["encodings"]}
+    fresh = enroll_images([pending_paths[digest] for digest in pending], args.workers, args.chunksize)
+    encodings_by_hash.update(zip(pending, fresh))
+
+    knownEncodings = []
+    knownNames = []
+    for imagePath, digest in zip(imagePaths, digests):
+        name = imagePath.split(os.path.sep)[-2]
+        for encoding in encodings_by_hash[digest]:
+            knownEncodings.append(encoding)
+            knownNames.append(name)
+
+    # Deleted files are dropped by only keeping the entries seen in this run
+    removed = len(set(cache["files"]) - set(files))
+    print(f"[INFO] encoded {len(pending)} images, reused {len(imagePaths) - len(pending)}, dropped {removed}")
+    with open(CACHE_PATH, "wb") as f:
+        f.write(pickle.dumps({"params": ENCODING_PARAMS, "files": files, "encodings": encodings_by_hash}))
+
+    print("[INFO] building gallery index...")
+    index = FaceIndex(knownEncodings, knownNames)
+
+    print("[INFO] serializing encodings...")
+    index.save(ENCODINGS_PATH)
+
+    print("[INFO] Training complete. Encodings saved to 'encodings.bin'")
+
+
+if __name__ == "__main__":
+    main()
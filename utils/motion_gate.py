@@ -0,0 +1,118 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap check whether anything moved, placed in front of detection.
+
+    Each frame is shrunk to a tiny grey image and compared with a slowly
+    updated background. Inference only runs when enough of the picture changed,
+    for `hold` seconds after that, and at least every `force_every` seconds as a
+    safety net. Slow changes such as daylight fade into the background instead
+    of counting as motion.
+
+    Seconds are counted on the frames' timestamps when they have them, so a
+    replayed clip is gated the same on every run however fast it is played,
+    and on the clock otherwise.
+    """
+
+    def __init__(self, size=(64, 48), threshold=12, min_changed=0.002, hold=1.0, force_every=2.0,
+                 learning_rate=0.05):
+        """
+        :param size: (width, height) frames are shrunk to before comparing
+        :param threshold: grey level difference that counts a pixel as changed
+        :param min_changed: share of changed pixels that counts as motion
+        :param hold: seconds inference keeps running after the last motion, so a person who stops moving is still seen
+        :param force_every: seconds after which a frame is let through even without motion
+        :param learning_rate: how fast the background follows the picture
+        """
+        self.size = size
+        self.threshold = threshold
+        self.min_changed = min_changed
+        self.hold = hold
+        self.force_every = force_every
+        self.learning_rate = learning_rate
+
+        self._background = None
+        self._small = None
+        self._difference = None
+        self._frame_size = None
+        self._last_motion = None
+        self._last_pass = None
+        self._now = None
+
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.forced_checks = 0
+        self.changed = 0.0  # share of changed pixels in the last frame
+
+    def check(self, frame, timestamp_ms=None):
+        """True when the frame should go through inference. The frame is not modified.
+        :param timestamp_ms: the frame's timestamp, such as a replayed frame's, None uses the clock
+        """
+        now = time.monotonic() if timestamp_ms is None else timestamp_ms / 1000
+        self._now = now
+        self.frames_checked += 1
+        self._frame_size = (frame.shape[1], frame.shape[0])
+
+        # A tiny blurred grey frame is enough to notice a person and hides sensor noise
+        self._small = cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        grey = cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY)
+        grey = cv2.GaussianBlur(grey, (5, 5), 0)
+
+        if self._background is None:
+            self._background = grey.astype(np.float32)
+            self._last_motion = self._last_pass = now
+            return True
+
+        difference = cv2.absdiff(grey, cv2.convertScaleAbs(self._background))
+        self._difference = difference
+        self.changed = float(np.count_nonzero(difference > self.threshold)) / difference.size
+        cv2.accumulateWeighted(grey, self._background, self.learning_rate)
+
+        if self.changed >= self.min_changed:
+            self._last_motion = now
+        if now - self._last_motion <= self.hold:
+            self._last_pass = now
+            return True
+        if now - self._last_pass >= self.force_every:
+            self.forced_checks += 1
+            self._last_pass = now
+            return True
+        self.frames_skipped += 1
+        return False
+
+    def regions(self):
+        """Where the last checked frame changed, as (x, y, w, h) boxes in that frame's pixels."""
+        if self._difference is None:
+            return []
+        mask = (self._difference > self.threshold).astype(np.uint8)
+        # Join neighbouring blobs of one moving person into one region
+        mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        scale_x = self._frame_size[0] / self.size[0]
+        scale_y = self._frame_size[1] / self.size[1]
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            boxes.append((int(x * scale_x), int(y * scale_y), int(w * scale_x), int(h * scale_y)))
+        return boxes
+
+    @property
+    def skip_ratio(self):
+        return self.frames_skipped / self.frames_checked if self.frames_checked else 0.0
+
+    @property
+    def idle(self):
+        """True while frames are being skipped because nothing moved."""
+        return self._last_motion is not None and self._now - self._last_motion > self.hold
+
+    def metrics(self):
+        return {
+            "frames_checked": self.frames_checked,
+            "frames_skipped": self.frames_skipped,
+            "forced_checks": self.forced_checks,
+            "skip_ratio": round(self.skip_ratio, 3),
+            "changed": round(self.changed, 4),
+        }
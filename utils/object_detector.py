@@ -0,0 +1,44 @@
+import threading
+import cv2
+import numpy as np
+import mediapipe as mp
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+
+
+class ObjectDetector:
+    """Synchronous MediaPipe ObjectDetector for worker threads.
+
+    Unlike AsyncDetectionDriver it returns the result of each frame directly,
+    which suits a scheduler that hands frames to a pool of threads. One
+    instance serves one stream, calls on the same instance are serialized.
+    """
+
+    def __init__(self, model="models/efficientdet_lite0.tflite", max_results=5, score_threshold=0.25):
+        """
+        :param model: path of the TFLite detection model
+        :param max_results: most detections returned per frame
+        :param score_threshold: lowest score a detection needs to be returned
+        """
+        self._lock = threading.Lock()
+        self._rgb = None
+        base_options = python.BaseOptions(model_asset_path=model)
+        options = vision.ObjectDetectorOptions(base_options=base_options,
+                                               running_mode=vision.RunningMode.IMAGE,
+                                               max_results=max_results, score_threshold=score_threshold)
+        self.detector = vision.ObjectDetector.create_from_options(options)
+
+    def detect(self, frame):
+        """Detect objects in a BGR frame, which may be a read-only view."""
+        with self._lock:
+            # Convert the image from BGR to RGB as required by the TFLite model, into a reused buffer
+            if self._rgb is None or self._rgb.shape != frame.shape:
+                self._rgb = np.empty_like(frame)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self._rgb)
+            return self.detector.detect(mp_image)
+
+    def close(self):
+        # Waits for a detect() still running on another thread
+        with self._lock:
+            self.detector.close()
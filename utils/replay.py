@@ -0,0 +1,280 @@
+import glob
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class VideoFileSource:
+    """Frames of a recorded clip, decoded in order."""
+
+    def __init__(self, path):
+        self.path = path
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise ValueError(f"Unable to open video file {path}")
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self.count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        self._position = 0
+
+    def frame(self, index):
+        """The BGR frame at index, None past the end. Going back reopens the clip."""
+        if index < self._position:
+            self._cap.release()
+            self._cap = cv2.VideoCapture(self.path)
+            self._position = 0
+        # Frames in between are grabbed but never converted
+        while self._position < index:
+            if not self._cap.grab():
+                return None
+            self._position += 1
+        ok, frame = self._cap.read()
+        self._position += 1
+        return frame if ok else None
+
+    def close(self):
+        self._cap.release()
+
+
+class ImageDirectorySource:
+    """Images of a directory or glob pattern in name order, for example datasets/face/*."""
+
+    def __init__(self, pattern, fps=1.0, size=None, cache=True):
+        """
+        :param pattern: directory, searched recursively, or glob pattern of image files
+        :param fps: rate the images are played at
+        :param size: (width, height) every image is resized to, so they can share display buffers
+        :param cache: keep decoded images in memory, so repeated runs do not measure disk reads
+        """
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*")
+        self.paths = sorted(path for path in glob.glob(pattern, recursive=True)
+                            if path.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise ValueError(f"No images found for {pattern}")
+        self.fps = fps
+        self.count = len(self.paths)
+        self.size = size
+        self._cache = {} if cache else None
+
+    def frame(self, index):
+        if index >= self.count:
+            return None
+        if self._cache is not None and index in self._cache:
+            return self._cache[index]
+        frame = cv2.imread(self.paths[index])
+        if self.size is not None:
+            frame = cv2.resize(frame, self.size)
+        if self._cache is not None:
+            self._cache[index] = frame
+        return frame
+
+    def close(self):
+        pass
+
+
+class SyntheticSource:
+    """Generated frames: a textured background with a few moving shapes.
+
+    Every frame is a function of its index and the seed only, so two runs see
+    exactly the same pixels without any file.
+    """
+
+    def __init__(self, size=(640, 480), count=300, fps=25.0, seed=0, shapes=3):
+        self.size = size
+        self.count = count
+        self.fps = fps
+        rng = np.random.default_rng(seed)
+        width, height = size
+        self._background = cv2.GaussianBlur(rng.integers(40, 220, (height, width, 3), dtype=np.uint8), (31, 31), 0)
+        # Start point, velocity in pixels per frame, radius and colour of every shape
+        self._shapes = [(rng.uniform(0, width), rng.uniform(0, height), rng.uniform(-6, 6), rng.uniform(-4, 4),
+                         int(rng.integers(20, 60)), tuple(int(c) for c in rng.integers(0, 256, 3)))
+                        for _ in range(shapes)]
+
+    def frame(self, index):
+        if self.count is not None and index >= self.count:
+            return None
+        width, height = self.size
+        frame = self._background.copy()
+        for x, y, dx, dy, radius, colour in self._shapes:
+            # Bounce off the edges
+            x = abs((x + dx * index) % (2 * width) - width)
+            y = abs((y + dy * index) % (2 * height) - height)
+            cv2.circle(frame, (int(x), int(y)), radius, colour, -1)
+        return frame
+
+    def close(self):
+        pass
+
+
+def open_source(source, fps=None, size=None):
+    """Frame source for a video file, an image directory or glob, or "synthetic".
+    :param fps: play rate for images and synthetic frames, video files keep their own unless given
+    """
+    if source == "synthetic":
+        return SyntheticSource(size=size or (640, 480), fps=fps or 25.0)
+    if os.path.isdir(source) or glob.has_magic(source) or source.lower().endswith(IMAGE_EXTENSIONS):
+        return ImageDirectorySource(source, fps=fps or 1.0, size=size)
+    video = VideoFileSource(source)
+    if fps:
+        video.fps = fps
+    return video
+
+
+class ReplayCapture:
+    """Plays a frame source like a camera, with the calls LatestFrameCapture offers.
+
+    Pacing decides which frames a consumer gets:
+      "realtime" plays at the source's frame rate and skips frames a slow
+                 consumer misses, like a live stream.
+      "fixed"    does the same at a given fps.
+      "fast"     hands out every frame in order, the next one on every read()
+                 or latest(), as fast as the consumer goes. Results are then
+                 repeatable bit for bit, it is meant for one consumer.
+    Timestamps come from the frame index and the play rate, not the clock, so
+    detect_async, the motion gate and the hub's frame interval see the same
+    timestamps on every run.
+
+    Register it with hub.replay() to feed a page that subscribes to a live
+    stream, or read it directly in a headless pipeline.
+    """
+
+    # Pages only take a frame once they are done with the last one, see Subscription.replayed
+    replayed = True
+
+    def __init__(self, source, pacing="realtime", fps=None, loop=False):
+        """
+        :param source: VideoFileSource, ImageDirectorySource, SyntheticSource, or anything open_source accepts
+        :param pacing: "realtime", "fixed" or "fast"
+        :param fps: play rate for "fixed" pacing, and the rate timestamps are counted at
+        :param loop: start over at the end instead of stopping
+        """
+        if pacing not in ("realtime", "fixed", "fast"):
+            raise ValueError(f"Unknown pacing {pacing!r}, use realtime, fixed or fast")
+        if pacing == "fixed" and not fps:
+            raise ValueError("Fixed pacing needs an fps")
+        self.source = open_source(source) if isinstance(source, str) else source
+        self.pacing = pacing
+        self.fps = fps or self.source.fps
+        self.loop = loop
+        # Replayed frames cost nothing until they are read, the hub's rate is not needed
+        self.target_fps = None
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_index = 0
+        self._read_index = 0
+        self._frame_time = None
+        self._started = None
+        self._released = False
+        self.finished = False
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+    def _load(self, index):
+        # index counts frames from 1 as LatestFrameCapture does, looping keeps counting up
+        position = index - 1
+        if self.loop and self.source.count:
+            position %= self.source.count
+        frame = self.source.frame(position)
+        if frame is None:
+            self.finished = True
+            return
+        if index > self._frame_index + 1:
+            self.frames_dropped += index - self._frame_index - 1
+        self._frame = frame
+        self._frame_index = index
+        self._frame_time = time.monotonic()
+        self.frames_read += 1
+
+    def _advance(self):
+        if self._released or self.finished:
+            return
+        if self.pacing == "fast":
+            self._load(self._frame_index + 1)
+            return
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        due = int((now - self._started) * self.fps) + 1
+        if due > self._frame_index:
+            self._load(due)
+
+    def read(self):
+        """Take the next due frame.
+        :return: (ok, frame), ok is False when no new frame is due or the source ended
+        """
+        with self._lock:
+            self._advance()
+            if self._read_index == self._frame_index:
+                return False, None
+            self._read_index = self._frame_index
+            # Image sources keep their frames, the caller gets its own copy to draw on
+            return True, self._frame.copy()
+
+    def latest(self):
+        """Peek at the newest due frame, see LatestFrameCapture.latest."""
+        with self._lock:
+            self._advance()
+            return self._frame_index, self._frame
+
+    @property
+    def read_index(self):
+        """Index of the frame read() handed out last, for its timestamp."""
+        with self._lock:
+            return self._read_index
+
+    def timestamp_ms(self, index):
+        """Timestamp of the frame at index, the same on every run."""
+        return int(round((index - 1) * 1000 / self.fps))
+
+    @property
+    def frame_age(self):
+        with self._lock:
+            if self._frame_time is None:
+                return None
+            return time.monotonic() - self._frame_time
+
+    def is_stale(self, max_age=2.0):
+        """A replay only goes stale when it has ended."""
+        return self.finished
+
+    def metrics(self):
+        return {"frames_read": self.frames_read, "frames_dropped": self.frames_dropped,
+                "down": self._released, "restarts": 0, "downtime_s": 0.0, "finished": self.finished}
+
+    def set_target_fps(self, fps):
+        pass
+
+    def isOpened(self):
+        return not self._released
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        with self._lock:
+            self._released = True
+            self.source.close()
+
+
+def replay_streams(hub, streams, source, pacing="realtime", fps=None, loop=False):
+    """Serve a replay of source to everyone who subscribes to any of streams.
+    Each stream gets its own ReplayCapture, so a stream read only now and then,
+    such as the main stream, does not move the others on.
+    :param hub: the CameraHub the pages subscribe through
+    :param streams: stream URLs the pages subscribe to, such as DEFAULT_STREAM and MAIN_STREAM
+    :param source: video file, image directory or glob, or "synthetic"
+    :return: the ReplayCaptures, in the order of streams
+    """
+    replays = []
+    for stream in streams:
+        replay = ReplayCapture(open_source(source, fps=fps), pacing=pacing, fps=fps, loop=loop)
+        hub.replay(stream, replay)
+        replays.append(replay)
+        print(f"[INFO] replaying {source} ({pacing}) instead of {stream}")
+    return replays
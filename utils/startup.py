@@ -0,0 +1,97 @@
+import threading
+import time
+
+
+class StartupProfile:
+    """Timing breakdown of application startup.
+
+    The main thread marks the end of each startup stage, heavy subsystems are
+    loaded on background threads with preload() so the window can paint first.
+    Pages ask is_ready() before using a subsystem that may still be loading,
+    and failure() once it is done, to report a load that raised.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = []      # (name, seconds) on the main thread, in order
+        self.background = []  # (name, seconds, seconds after start when it finished)
+        self.errors = {}
+        self._last = self.start
+        self._lock = threading.Lock()
+        self._loaded = {}
+
+    def begin(self, at):
+        """Count startup from an earlier perf_counter() reading, e.g. taken before the first import."""
+        self.start = self._last = at
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def mark(self, stage):
+        """Record the time since the previous mark as the cost of stage."""
+        now = time.perf_counter()
+        with self._lock:
+            self.stages.append((stage, now - self._last))
+            self._last = now
+
+    def preload(self, name, load):
+        """Run load() on a daemon thread and record how long it took.
+        :param name: subsystem name, used with is_ready()
+        :param load: function that imports and initializes the subsystem
+        """
+        with self._lock:
+            if name in self._loaded:
+                return
+            self._loaded[name] = threading.Event()
+
+        def run():
+            started = time.perf_counter()
+            try:
+                load()
+            except Exception as e:
+                # Kept for the pages, they show it instead of waiting for the subsystem
+                with self._lock:
+                    self.errors[name] = e
+                print(f"[ERROR] preloading {name} failed: {e}")
+            else:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.background.append((name, finished - started, finished - self.start))
+                print(f"[INFO] {name} loaded in {finished - started:.2f}s "
+                      f"({finished - self.start:.2f}s after start)")
+            finally:
+                # Whatever happened, nobody should keep waiting for it
+                self._loaded[name].set()
+
+        threading.Thread(target=run, name=f"preload {name}", daemon=True).start()
+
+    def is_ready(self, name):
+        """False while name is still loading in the background, True once done or if never preloaded."""
+        event = self._loaded.get(name)
+        return event is None or event.is_set()
+
+    def failure(self, name):
+        """The exception name's background load raised, None if it has not failed."""
+        with self._lock:
+            return self.errors.get(name)
+
+    def pending(self):
+        """Names of the subsystems still loading in the background."""
+        return [name for name, event in list(self._loaded.items()) if not event.is_set()]
+
+    def report(self):
+        """Print the startup breakdown so far."""
+        print("[INFO] startup timing:")
+        with self._lock:
+            stages, background = list(self.stages), list(self.background)
+        for stage, seconds in stages:
+            print(f"[INFO]   {stage:<24} {seconds * 1000:8.1f} ms")
+        total = sum(seconds for _, seconds in stages)
+        print(f"[INFO]   {'total':<24} {total * 1000:8.1f} ms")
+        for name, seconds, finished in background:
+            print(f"[INFO]   {name + ' (background)':<24} {seconds * 1000:8.1f} ms, "
+                  f"ready at {finished:.2f}s")
+
+
+# Created when first imported, app.py moves its start to before its first import
+startup = StartupProfile()
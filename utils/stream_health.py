@@ -0,0 +1,82 @@
+import time
+
+
+class StreamHealthMonitor:
+    """Decides when a camera stream needs reconnecting.
+
+    It tracks consecutive read failures, how long ago the last frame arrived and
+    how long decoding takes. A reconnect is only requested when the stream is
+    actually unhealthy, and repeated reconnects back off exponentially.
+    """
+
+    def __init__(self, max_failures=30, stale_after=5.0, backoff_initial=1.0, backoff_max=30.0):
+        """
+        :param max_failures: consecutive failed reads that count as a broken stream
+        :param stale_after: seconds without a frame that count as a stalled stream
+        :param backoff_initial: seconds to wait after the first reconnect
+        :param backoff_max: upper bound for the wait between reconnects
+        """
+        self.max_failures = max_failures
+        self.stale_after = stale_after
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self.consecutive_failures = 0
+        self.last_frame_time = time.monotonic()
+        self.decode_time = None  # moving average, seconds
+        self.restarts = 0
+        self.downtime = 0.0
+        self._down_since = None
+        self._backoff = backoff_initial
+        self._next_attempt = 0.0
+
+    def record_frame(self, decode_seconds):
+        now = time.monotonic()
+        if self._down_since is not None:
+            self.downtime += now - self._down_since
+            self._down_since = None
+        self.consecutive_failures = 0
+        self.last_frame_time = now
+        self._backoff = self.backoff_initial
+        if self.decode_time is None:
+            self.decode_time = decode_seconds
+        else:
+            self.decode_time = 0.9 * self.decode_time + 0.1 * decode_seconds
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+
+    def should_reconnect(self):
+        """True when the stream is unhealthy and the backoff delay has passed."""
+        now = time.monotonic()
+        stale = now - self.last_frame_time > self.stale_after
+        if stale and self._down_since is None:
+            self._down_since = self.last_frame_time
+        unhealthy = stale or self.consecutive_failures >= self.max_failures
+        return unhealthy and now >= self._next_attempt
+
+    def record_reconnect(self):
+        self.restarts += 1
+        self.consecutive_failures = 0
+        self._next_attempt = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, self.backoff_max)
+
+    @property
+    def is_down(self):
+        return self._down_since is not None
+
+    def metrics(self):
+        """Snapshot of the stream health for logging or display."""
+        downtime = self.downtime
+        if self._down_since is not None:
+            downtime += time.monotonic() - self._down_since
+        return {
+            "restarts": self.restarts,
+            "downtime_s": round(downtime, 1),
+            "down": self.is_down,
+            "consecutive_failures": self.consecutive_failures,
+            "frame_age_s": round(time.monotonic() - self.last_frame_time, 2),
+            "decode_ms": None if self.decode_time is None else round(self.decode_time * 1000, 1),
+        }
@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+
+
+class StreamBudget:
+    """Inference budget and bookkeeping for one camera stream."""
+
+    def __init__(self, name, source, process, fps, priority):
+        """
+        :param name: label used in reports
+        :param source: anything with read(copy=False) -> (ok, frame), e.g. a camera hub Subscription
+        :param process: function run on a worker thread for each frame, returns the result
+        :param fps: frames per second this stream should be processed at
+        :param priority: relative weight when there is not enough capacity for every target
+        """
+        self.name = name
+        self.source = source
+        self.process = process
+        self.target_fps = fps
+        self.priority = priority
+        self.allowed_fps = fps  # lowered by the scheduler when overloaded
+        self.next_due = 0.0
+        self.busy = False
+        self.latest = None
+        self.process_time = None  # moving average, seconds
+        self.achieved_fps = 0.0
+        self.frames_processed = 0
+        self.errors = 0
+        self._window_count = 0
+
+    def cost(self):
+        """Worker seconds per second needed to reach the target."""
+        return self.target_fps * self.process_time
+
+    def report(self):
+        return {
+            "name": self.name,
+            "priority": self.priority,
+            "target_fps": self.target_fps,
+            "allowed_fps": round(self.allowed_fps, 2),
+            "achieved_fps": round(self.achieved_fps, 2),
+            "process_ms": None if self.process_time is None else round(self.process_time * 1000, 1),
+            "frames_processed": self.frames_processed,
+            "errors": self.errors,
+        }
+
+
+class StreamScheduler:
+    """Spreads per-stream inference over a pool of worker threads.
+
+    Each stream gets an FPS target and a priority. Workers always take the
+    stream that is most overdue relative to its priority, and each stream has
+    at most one frame in progress, so a slow stream never holds up the others.
+    Every rebalance_interval the scheduler compares the measured cost of all
+    targets with the workers available; when they do not fit, each stream's
+    allowed rate is lowered, sharing the capacity by priority, instead of
+    letting work queue up. The frame is read when a worker picks the stream
+    up, so it is always the newest one.
+
+    TFLite releases the GIL while it runs, so object detection on worker
+    threads does run on separate cores. dlib does not help: its face detectors
+    are serialized process-wide (see utils.face_detectors.dlib_detector_lock)
+    and its encoder holds the GIL, so face recognition only spreads over cores
+    when faces are encoded in a ProcessEncoder.
+    """
+
+    def __init__(self, workers=None, rebalance_interval=1.0, utilization=0.9, min_fps=0.2):
+        """
+        :param workers: worker threads, defaults to the number of cores
+        :param rebalance_interval: seconds between recomputing the allowed rates
+        :param utilization: share of the workers' time the targets may use up
+        :param min_fps: no stream is throttled below this rate
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.rebalance_interval = rebalance_interval
+        self.utilization = utilization
+        self.min_fps = min_fps
+        self.streams = {}
+        self._condition = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._generation = 0
+        self._window_start = time.monotonic()
+
+    def add_stream(self, name, source, process, fps=5.0, priority=1.0):
+        with self._condition:
+            self.streams[name] = StreamBudget(name, source, process, fps, priority)
+            self._condition.notify()
+
+    def remove_stream(self, name):
+        with self._condition:
+            return self.streams.pop(name, None)
+
+    def start(self):
+        with self._condition:
+            self._running = True
+            # Workers of an earlier start that are still finishing a frame exit after it
+            self._generation += 1
+            generation = self._generation
+        self._window_start = time.monotonic()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, args=(generation,),
+                                      name=f"stream worker {index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=0.1):
+        """Tell the workers to exit once their current frame is done.
+        :param timeout: seconds to wait for them in total, None waits until they are all gone.
+            Workers still busy after that finish their frame in the background
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def take(self, name):
+        """The newest (frame, result) of a stream, or (None, None) if nothing new was processed."""
+        with self._condition:
+            stream = self.streams.get(name)
+            if stream is None or stream.latest is None:
+                return None, None
+            latest, stream.latest = stream.latest, None
+        return latest
+
+    def report(self):
+        """Target, allowed and achieved rates of every stream."""
+        with self._condition:
+            return [stream.report() for stream in self.streams.values()]
+
+    def _next_stream(self, now):
+        # Most overdue first, a higher priority makes the same delay count for more
+        due = [stream for stream in self.streams.values() if not stream.busy and stream.next_due <= now]
+        if not due:
+            return None
+        return max(due, key=lambda stream: (now - stream.next_due + 1e-3) * stream.priority)
+
+    def _wait_time(self, now):
+        idle = [stream.next_due - now for stream in self.streams.values() if not stream.busy]
+        return max(0.001, min(idle)) if idle else None
+
+    def _worker(self, generation):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._running or generation != self._generation:
+                        return
+                    now = time.monotonic()
+                    if now - self._window_start >= self.rebalance_interval:
+                        self._rebalance(now)
+                    stream = self._next_stream(now)
+                    if stream is not None:
+                        break
+                    self._condition.wait(self._wait_time(now))
+                stream.busy = True
+                stream.next_due = now + 1.0 / stream.allowed_fps
+
+            ok, frame = stream.source.read(copy=False)
+            result = None
+            failed = False
+            started = time.monotonic()
+            if ok:
+                try:
+                    result = stream.process(frame)
+                except Exception as e:
+                    # Counted and retried at the stream's normal rate
+                    failed = True
+                    print(f"[ERROR] processing {stream.name} failed: {e}")
+            elapsed = time.monotonic() - started
+
+            with self._condition:
+                stream.busy = False
+                if failed:
+                    stream.errors += 1
+                elif not ok:
+                    # No new frame yet, look again soon rather than waiting a whole interval
+                    stream.next_due = min(stream.next_due, time.monotonic() + 0.01)
+                else:
+                    stream.latest = (frame, result)
+                    stream.frames_processed += 1
+                    stream._window_count += 1
+                    if stream.process_time is None:
+                        stream.process_time = elapsed
+                    else:
+                        stream.process_time = 0.8 * stream.process_time + 0.2 * elapsed
+                self._condition.notify()
+
+    def _rebalance(self, now):
+        """Recompute the allowed rates, called with the condition held."""
+        elapsed = now - self._window_start
+        self._window_start = now
+        streams = list(self.streams.values())
+        for stream in streams:
+            # Smoothed over a few windows, a window only holds a handful of frames at low rates
+            stream.achieved_fps = 0.5 * stream.achieved_fps + 0.5 * stream._window_count / elapsed
+            stream._window_count = 0
+
+        # Streams without a measurement yet run at their target until they have one
+        measured = [stream for stream in streams if stream.process_time]
+        capacity = self.workers * self.utilization
+        if sum(stream.cost() for stream in measured) <= capacity:
+            for stream in streams:
+                stream.allowed_fps = stream.target_fps
+            return
+
+        # Share the capacity by priority; streams that need less than their share get
+        # their full target and the rest is shared again among the others
+        remaining = sorted(measured, key=lambda stream: stream.cost() / stream.priority)
+        while remaining:
+            weight = sum(stream.priority for stream in remaining)
+            stream = remaining[0]
+            share = capacity * stream.priority / weight
+            if stream.cost() <= share:
+                stream.allowed_fps = stream.target_fps
+                capacity -= stream.cost()
+                remaining.pop(0)
+                continue
+            for stream in remaining:
+                share = capacity * stream.priority / weight
+                stream.allowed_fps = max(self.min_fps, share / stream.process_time)
+            break
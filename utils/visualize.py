@@ -56,4 +56,24 @@ def visualize(
     if category_name == "person":
       person_detected = True
 
-  return image, person_detected
\ No newline at end of file
+  return image, person_detected
+
+
+def person_boxes(
+    detection_result,
+    min_score=0.0
+) -> list:
+  """Returns the boxes of the people in a detection result.
+  Args:
+    detection_result: The detection result of the object detector.
+    min_score: The lowest "person" score a box needs to be returned.
+  Returns:
+    List of (x, y, w, h) boxes in image pixels.
+  """
+  boxes = []
+  for detection in detection_result.detections:
+    category = detection.categories[0]
+    if category.category_name == "person" and category.score >= min_score:
+      bbox = detection.bounding_box
+      boxes.append((bbox.origin_x, bbox.origin_y, bbox.width, bbox.height))
+  return boxes